@@ -0,0 +1,102 @@
+"""
+Salida de las operaciones en un único archivo ZIP o TAR en lugar de una carpeta.
+
+Las funciones del núcleo que escriben muchos archivos pequeños (dividir, PDF a
+JPG) guardan cada salida con guardar(ruta_salida, escribir). Con un Archivador
+esa ruta se convierte en una entrada del archivo, relativa a su raíz, y el
+contenido se genera en memoria y se añade directamente, sin crear el archivo
+suelto en disco. Igual que los PDFs unidos, el archivo se escribe con el sufijo
+.parcial y solo se mueve a su nombre definitivo al cerrarlo sin errores.
+
+Los procesos trabajadores no pueden escribir en el mismo archivo: guardan sus
+salidas en un EntradasEnMemoria y el proceso principal las añade con anadir()
+en cuanto termina cada tarea.
+"""
+import io
+import os
+import time
+import tarfile
+import zipfile
+
+from diario import SUFIJO_PARCIAL
+
+EXTENSIONES_ARCHIVO = (".zip", ".tar", ".tar.gz", ".tgz")
+
+def es_archivo_comprimido(ruta):
+    """Indica si `ruta` es un ZIP o TAR de salida (por su extensión) en lugar de una carpeta."""
+    return ruta.lower().endswith(EXTENSIONES_ARCHIVO)
+
+class Archivador:
+    """Archivo ZIP o TAR en el que se van añadiendo las salidas de una operación."""
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._temporal = ruta + SUFIJO_PARCIAL
+        self._nombres = set()
+        carpeta = os.path.dirname(ruta)
+        if carpeta and not os.path.exists(carpeta):
+            os.makedirs(carpeta)
+        if ruta.lower().endswith(".zip"):
+            # Los PDFs ya llevan los flujos comprimidos y los JPG no se comprimen más: se guardan tal cual
+            self._zip = zipfile.ZipFile(self._temporal, "w", zipfile.ZIP_STORED, allowZip64=True)
+            self._tar = None
+        else:
+            self._zip = None
+            self._tar = tarfile.open(self._temporal, "w" if ruta.lower().endswith(".tar") else "w:gz")
+
+    def _nombre_entrada(self, ruta_salida):
+        """Nombre de la entrada para ruta_salida; si ya existe se le añade _2, _3..."""
+        nombre = os.path.relpath(ruta_salida, self.ruta).replace(os.sep, "/")
+        base, extension = os.path.splitext(nombre)
+        repeticion = 1
+        while nombre in self._nombres:
+            repeticion += 1
+            nombre = f"{base}_{repeticion}{extension}"
+        self._nombres.add(nombre)
+        return nombre
+
+    def anadir(self, ruta_salida, datos):
+        """Añade los bytes `datos` como la entrada de ruta_salida y devuelve su tamaño."""
+        nombre = self._nombre_entrada(ruta_salida)
+        if self._zip is not None:
+            info = zipfile.ZipInfo(nombre, date_time=time.localtime()[:6])
+            info.external_attr = 0o644 << 16
+            self._zip.writestr(info, datos)
+        else:
+            info = tarfile.TarInfo(nombre)
+            info.size = len(datos)
+            info.mtime = time.time()
+            self._tar.addfile(info, io.BytesIO(datos))
+        return len(datos)
+
+    def guardar(self, ruta_salida, escribir):
+        """Como escribir_atomico, pero la salida va al archivo: llama a escribir(f) y añade el resultado."""
+        datos = io.BytesIO()
+        escribir(datos)
+        return self.anadir(ruta_salida, datos.getvalue())
+
+    def cerrar(self, correcto=True):
+        (self._zip or self._tar).close()
+        if correcto:
+            os.replace(self._temporal, self.ruta)
+        elif os.path.exists(self._temporal):
+            os.remove(self._temporal)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        self.cerrar(correcto=tipo is None)
+        return False
+
+class EntradasEnMemoria:
+    """Salidas de un proceso trabajador pendientes de añadir al Archivador del proceso principal."""
+
+    def __init__(self):
+        self.entradas = []
+
+    def guardar(self, ruta_salida, escribir):
+        datos = io.BytesIO()
+        escribir(datos)
+        self.entradas.append((ruta_salida, datos.getvalue()))
+        return len(self.entradas[-1][1])
@@ -0,0 +1,337 @@
+"""
+Banco de pruebas de rendimiento de blanchedalmond.
+
+Genera un corpus sintético de boletines (PDFs con «Alumne/a: Nombre», una tabla
+de notas, un logotipo y, si se encuentra, una fuente TrueType incrustada) y mide
+cada operación del núcleo en un proceso aparte: páginas por segundo (PDFs por
+segundo al renombrar), memoria máxima del proceso que más usa (RSS, el de la
+etapa o uno de sus procesos hijos) y tamaño de la salida. Los resultados se
+guardan en JSON para comparar versiones:
+
+    python benchmark.py --archivos 20 --paginas 30 --salida antes.json
+    python benchmark.py --archivos 20 --paginas 30 --salida despues.json --comparar antes.json
+
+El corpus no necesita más dependencias que las del propio programa; las
+etapas cuyo módulo opcional no está instalado (pdf2image, PIL) se omiten.
+"""
+import os
+import sys
+import json
+import time
+import zlib
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+
+try:
+    import resource
+except ImportError:
+    # Windows: no se puede medir la memoria máxima con getrusage
+    resource = None
+
+NOMBRES = ["Aina", "Pau", "Júlia", "Marc", "Laura", "Jordi", "Núria", "Àlex", "Carla", "Iván",
+           "Lucía", "Hugo", "Martina", "Pol", "Sara", "Adrià", "Elena", "Òscar", "Paula", "David"]
+APELLIDOS = ["Garcia", "Martínez", "Puig", "Ferrer", "López", "Soler", "Vidal", "Roca", "Sánchez",
+             "Font", "Pérez", "Serra", "Castells", "Navarro", "Ribas", "Moreno", "Costa", "Ortega"]
+ASIGNATURAS = ["Llengua catalana", "Lengua castellana", "Matemàtiques", "Anglès", "Ciències naturals",
+               "Ciències socials", "Educació física", "Música", "Tecnologia", "Educació visual i plàstica"]
+NOTAS = ["Excel·lent", "Notable", "Bé", "Suficient", "Insuficient"]
+
+# Fuentes TrueType que se buscan para incrustar, como en los boletines reales
+FUENTES_CANDIDATAS = [
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/TTF/DejaVuSans.ttf",
+    "/Library/Fonts/Arial.ttf",
+    "C:\\Windows\\Fonts\\arial.ttf",
+]
+LADO_LOGO = 160
+
+ETAPAS = ["nombres", "dividir", "renombrar", "unir", "pdf2jpg", "jpg2pdf"]
+
+# --- Generador de boletines ---
+def _escapar(texto):
+    """Cadena literal PDF en WinAnsi (latin-1 para estos caracteres)."""
+    datos = texto.encode("latin-1", "replace")
+    return b"(" + datos.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+def _flujo(diccionario, datos):
+    return diccionario + b"/Length %d>>\nstream\n" % len(datos) + datos + b"\nendstream"
+
+def _recursos_compartidos(objetos, fuente, logo):
+    """Añade a `objetos` la fuente y el logotipo que comparten todas las páginas; devuelve sus números."""
+    if fuente is not None:
+        objetos.append(_flujo(b"<</Length1 %d/Filter/FlateDecode" % len(fuente), zlib.compress(fuente)))
+        archivo_fuente = len(objetos)
+        objetos.append(b"<</Type/FontDescriptor/FontName/BancoSans/Flags 32/FontBBox[-1021 -463 1793 1232]"
+                       b"/ItalicAngle 0/Ascent 928/Descent -236/CapHeight 729/StemV 80/FontFile2 %d 0 R>>"
+                       % archivo_fuente)
+        descriptor = len(objetos)
+        anchos = b" ".join([b"556"] * 224)
+        objetos.append(b"<</Type/Font/Subtype/TrueType/BaseFont/BancoSans/Encoding/WinAnsiEncoding"
+                       b"/FirstChar 32/LastChar 255/Widths[" + anchos + b"]/FontDescriptor %d 0 R>>" % descriptor)
+    else:
+        objetos.append(b"<</Type/Font/Subtype/Type1/BaseFont/Helvetica/Encoding/WinAnsiEncoding>>")
+    numero_fuente = len(objetos)
+    objetos.append(_flujo(b"<</Type/XObject/Subtype/Image/Width %d/Height %d/ColorSpace/DeviceRGB"
+                          b"/BitsPerComponent 8/Filter/FlateDecode" % (LADO_LOGO, LADO_LOGO), zlib.compress(logo)))
+    return numero_fuente, len(objetos)
+
+def _contenido_boletin(nombre, azar):
+    lineas = [b"q %d 0 0 %d 40 640 cm /Logo Do Q" % (LADO_LOGO, LADO_LOGO),
+              b"BT /F1 16 Tf 220 770 Td " + _escapar("INFORME D'AVALUACIÓ") + b" Tj ET",
+              b"BT /F1 12 Tf 220 740 Td " + _escapar("Curs 2025-2026") + b" Tj ET",
+              b"BT /F1 12 Tf 220 710 Td " + _escapar(f"Alumne/a: {nombre}") + b" Tj ET",
+              b"BT /F1 10 Tf 60 600 Td 16 TL"]
+    for asignatura in ASIGNATURAS:
+        lineas.append(_escapar(f"{asignatura}: {azar.choice(NOTAS)}") + b" Tj T*")
+        lineas.append(_escapar("Observacions: " + " ".join(azar.choice(APELLIDOS).lower() for _ in range(12)))
+                      + b" Tj T*")
+    lineas.append(b"ET")
+    return zlib.compress(b"\n".join(lineas))
+
+def _nombre_nuevo(azar, usados):
+    """Nombre de alumno que no está en `usados` (así cada página da un archivo distinto al dividir)."""
+    while True:
+        nombre = f"{azar.choice(NOMBRES)} {azar.choice(APELLIDOS)} {azar.choice(APELLIDOS)}"
+        if nombre not in usados:
+            usados.add(nombre)
+            return nombre
+
+def generar_boletines(ruta, paginas, azar, fuente=None, logo=None, usados=None):
+    """
+    Escribe en `ruta` un PDF de `paginas` boletines de una página, cada uno con un
+    alumno distinto. Devuelve la lista de nombres en orden de página.
+    """
+    logo = logo if logo is not None else bytes(LADO_LOGO * LADO_LOGO * 3)
+    usados = usados if usados is not None else set()
+    objetos = [None, b"<</Type/Catalog/Pages 1 0 R>>"]
+    numero_fuente, numero_logo = _recursos_compartidos(objetos, fuente, logo)
+    recursos = b"<</Font<</F1 %d 0 R>>/XObject<</Logo %d 0 R>>>>" % (numero_fuente, numero_logo)
+    nombres = []
+    hijos = []
+    for _ in range(paginas):
+        nombre = _nombre_nuevo(azar, usados)
+        nombres.append(nombre)
+        objetos.append(_flujo(b"<</Filter/FlateDecode", _contenido_boletin(nombre, azar)))
+        objetos.append(b"<</Type/Page/Parent 1 0 R/MediaBox[0 0 595 842]/Resources " + recursos
+                       + b"/Contents %d 0 R>>" % len(objetos))
+        hijos.append(b"%d 0 R" % len(objetos))
+    objetos[0] = b"<</Type/Pages/Count %d/Kids[" % paginas + b" ".join(hijos) + b"]>>"
+
+    with open(ruta, "wb") as f:
+        f.write(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+        posiciones = []
+        for numero, objeto in enumerate(objetos, 1):
+            posiciones.append(f.tell())
+            f.write(b"%d 0 obj\n" % numero + objeto + b"\nendobj\n")
+        inicio_xref = f.tell()
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objetos) + 1))
+        f.writelines(b"%010d 00000 n \n" % posicion for posicion in posiciones)
+        f.write(b"trailer\n<</Size %d/Root 2 0 R>>\nstartxref\n%d\n%%%%EOF\n" % (len(objetos) + 1, inicio_xref))
+    return nombres
+
+def buscar_fuente():
+    """Bytes de la primera fuente TrueType encontrada, o None."""
+    for ruta in FUENTES_CANDIDATAS:
+        if os.path.exists(ruta):
+            with open(ruta, "rb") as f:
+                return f.read()
+    return None
+
+def generar_corpus(carpeta, archivos, paginas, semilla=0, incrustar_fuente=True):
+    """Genera `archivos` PDFs de `paginas` boletines en carpeta. Devuelve el total de páginas."""
+    if archivos * paginas > len(NOMBRES) * len(APELLIDOS) ** 2:
+        raise ValueError("Demasiadas páginas para generar un nombre distinto en cada una.")
+    os.makedirs(carpeta, exist_ok=True)
+    usados = set()
+    azar = random.Random(semilla)
+    fuente = buscar_fuente() if incrustar_fuente else None
+    # Logotipo con ruido: no se comprime, como una foto del escudo del centro
+    tamano_logo = LADO_LOGO * LADO_LOGO * 3
+    logo = azar.getrandbits(8 * tamano_logo).to_bytes(tamano_logo, "little")
+    for numero in range(archivos):
+        generar_boletines(os.path.join(carpeta, f"grupo_{numero + 1:03d}.pdf"), paginas, azar, fuente, logo, usados)
+    return archivos * paginas
+
+# --- Medición ---
+def tamano_ruta(ruta):
+    """Tamaño en bytes de un archivo o de todo lo que contiene una carpeta."""
+    if os.path.isfile(ruta):
+        return os.path.getsize(ruta)
+    return sum(os.path.getsize(os.path.join(raiz, archivo))
+               for raiz, _, archivos in os.walk(ruta) for archivo in archivos)
+
+def memoria_maxima_mb():
+    """
+    Memoria máxima (RSS) en MB del proceso que más ha usado, este o uno de sus
+    hijos ya terminados, o None si no se puede medir. No es el pico del conjunto:
+    getrusage solo da el máximo de un proceso, no la suma de los del pool.
+    """
+    if resource is None:
+        return None
+    propia = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    hijos = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    # ru_maxrss está en KB en Linux y en bytes en macOS
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(max(propia, hijos) / divisor, 1)
+
+def preparar_etapa(etapa, trabajo):
+    """
+    Prepara lo que necesita una etapa antes de empezar a medirla. Las etapas
+    posteriores usan las salidas de las anteriores dentro de `trabajo`;
+    renombrar trabaja sobre una copia de la división con las páginas llamadas
+    pagina_N.pdf, como las deja dividir con prefijo.
+    """
+    # Etapas que trabajan sobre la salida de otra
+    requisitos = {"renombrar": ("dividido", "dividir"), "unir": ("dividido", "dividir"),
+                  "jpg2pdf": ("jpg", "pdf2jpg")}
+    if etapa in requisitos:
+        carpeta_previa = os.path.join(trabajo, requisitos[etapa][0])
+        if not (os.path.isdir(carpeta_previa) and os.listdir(carpeta_previa)):
+            raise RuntimeError(f"requiere la salida de la etapa {requisitos[etapa][1]}")
+    if etapa == "renombrar":
+        destino = os.path.join(trabajo, "renombrado")
+        shutil.rmtree(destino, ignore_errors=True)
+        for raiz, _, nombres in sorted(os.walk(os.path.join(trabajo, "dividido"))):
+            pdfs = sorted(archivo for archivo in nombres if archivo.endswith(".pdf"))
+            if not pdfs:
+                continue
+            carpeta = os.path.join(destino, os.path.relpath(raiz, os.path.join(trabajo, "dividido")))
+            os.makedirs(carpeta)
+            for numero, archivo in enumerate(pdfs, 1):
+                shutil.copyfile(os.path.join(raiz, archivo), os.path.join(carpeta, f"pagina_{numero}.pdf"))
+
+def ejecutar_etapa(etapa, corpus, trabajo, procesos):
+    """
+    Ejecuta en este proceso una etapa ya preparada con preparar_etapa y devuelve
+    (páginas, ruta de la salida); en renombrar, (PDFs renombrados, carpeta).
+    """
+    import nucleo
+    archivos = sorted(os.path.join(corpus, archivo) for archivo in os.listdir(corpus))
+    if etapa == "nombres":
+        return sum(len(nucleo.extraer_nombres_pdf(archivo)) for archivo in archivos), None
+    if etapa == "dividir":
+        destino = os.path.join(trabajo, "dividido")
+        resultados = nucleo.dividir_pdfs_carpeta(corpus, destino, procesos=procesos)
+        return sum(resultado["paginas"] for resultado in resultados), destino
+    if etapa == "renombrar":
+        destino = os.path.join(trabajo, "renombrado")
+        plan, _ = nucleo.renombrar_pdfs(destino)
+        return sum(1 for origen, nuevo, _ in plan if origen != nuevo), destino
+    if etapa == "unir":
+        # Une las páginas sueltas de la división: el caso en que más se repiten logotipo y fuentes
+        destino = os.path.join(trabajo, "unido.pdf")
+        origenes = [os.path.join(raiz, archivo) for raiz, _, nombres in sorted(os.walk(os.path.join(trabajo, "dividido")))
+                    for archivo in sorted(nombres) if archivo.endswith(".pdf")]
+        return nucleo.unir_pdfs(origenes, destino), destino
+    if etapa == "pdf2jpg":
+        destino = os.path.join(trabajo, "jpg")
+        return nucleo.pdf_a_jpg(archivos[0], destino, procesos=procesos), destino
+    if etapa == "jpg2pdf":
+        destino = os.path.join(trabajo, "jpg.pdf")
+        return nucleo.unir_jpgs([os.path.join(trabajo, "jpg")], destino), destino
+    raise ValueError(f"Etapa desconocida: {etapa}")
+
+def medir_etapa(etapa, corpus, trabajo, procesos):
+    """Lanza la etapa en un proceso nuevo para que la memoria máxima sea solo la suya."""
+    orden = [sys.executable, os.path.abspath(__file__), "--etapa", etapa, "--corpus", corpus,
+             "--trabajo", trabajo, "--procesos", str(procesos)]
+    proceso = subprocess.run(orden, capture_output=True, text=True)
+    if proceso.returncode != 0:
+        error = (proceso.stderr.strip().splitlines() or ["error desconocido"])[-1]
+        return {"etapa": etapa, "omitida": error}
+    return json.loads(proceso.stdout.strip().splitlines()[-1])
+
+def medir_en_este_proceso(etapa, corpus, trabajo, procesos):
+    preparar_etapa(etapa, trabajo)
+    inicio = time.perf_counter()
+    paginas, salida = ejecutar_etapa(etapa, corpus, trabajo, procesos)
+    segundos = time.perf_counter() - inicio
+    return {
+        "etapa": etapa,
+        "paginas": paginas,
+        "segundos": round(segundos, 3),
+        "paginas_por_segundo": round(paginas / segundos, 1) if segundos > 0 else None,
+        "memoria_max_mb": memoria_maxima_mb(),
+        "bytes_salida": tamano_ruta(salida) if salida and os.path.exists(salida) else None,
+    }
+
+def comparar(resultados, anteriores):
+    """Muestra la variación de páginas/s y memoria respecto a un JSON anterior."""
+    previas = {etapa["etapa"]: etapa for etapa in anteriores["etapas"] if "omitida" not in etapa}
+    print(f"\nComparación con {anteriores.get('fecha', '?')}:")
+    for etapa in resultados["etapas"]:
+        previa = previas.get(etapa["etapa"])
+        if previa is None or "omitida" in etapa or not previa["paginas_por_segundo"]:
+            continue
+        velocidad = etapa["paginas_por_segundo"] / previa["paginas_por_segundo"]
+        linea = f"  {etapa['etapa']:<10} {velocidad:5.2f}x páginas/s"
+        if etapa["memoria_max_mb"] and previa["memoria_max_mb"]:
+            linea += f", memoria {etapa['memoria_max_mb'] - previa['memoria_max_mb']:+.1f} MB"
+        print(linea)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mide el rendimiento de las operaciones de blanchedalmond.")
+    parser.add_argument("--archivos", type=int, default=10, help="PDFs del corpus (por defecto: %(default)s)")
+    parser.add_argument("--paginas", type=int, default=30, help="boletines por PDF (por defecto: %(default)s)")
+    parser.add_argument("--semilla", type=int, default=0, help="semilla del generador (por defecto: %(default)s)")
+    parser.add_argument("--sin-fuente", action="store_true", help="no incrustar ninguna fuente TrueType")
+    parser.add_argument("--procesos", type=int, default=os.cpu_count() or 1,
+                        help="procesos para dividir y rasterizar (por defecto: %(default)s)")
+    parser.add_argument("--etapas", default=",".join(ETAPAS), help="etapas a medir (por defecto: %(default)s)")
+    parser.add_argument("--salida", default="benchmark.json", help="JSON de resultados (por defecto: %(default)s)")
+    parser.add_argument("--comparar", help="JSON de una ejecución anterior con el que comparar")
+    # Uso interno: ejecutar una sola etapa en un proceso hijo
+    parser.add_argument("--etapa", help=argparse.SUPPRESS)
+    parser.add_argument("--corpus", help=argparse.SUPPRESS)
+    parser.add_argument("--trabajo", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.etapa:
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        print(json.dumps(medir_en_este_proceso(args.etapa, args.corpus, args.trabajo, args.procesos)))
+        return 0
+
+    trabajo = tempfile.mkdtemp(prefix="blanchedalmond_banco_")
+    try:
+        corpus = os.path.join(trabajo, "corpus")
+        inicio = time.perf_counter()
+        total = generar_corpus(corpus, args.archivos, args.paginas, args.semilla, not args.sin_fuente)
+        print(f"Corpus: {args.archivos} PDFs, {total} páginas, {tamano_ruta(corpus) / 1e6:.1f} MB "
+              f"en {time.perf_counter() - inicio:.1f} s")
+        resultados = {
+            "fecha": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "cpus": os.cpu_count(),
+            "parametros": {"archivos": args.archivos, "paginas": args.paginas, "semilla": args.semilla,
+                           "fuente_incrustada": not args.sin_fuente, "procesos": args.procesos},
+            "etapas": [],
+        }
+        for etapa in [etapa.strip() for etapa in args.etapas.split(",") if etapa.strip()]:
+            medida = medir_etapa(etapa, corpus, trabajo, args.procesos)
+            resultados["etapas"].append(medida)
+            if "omitida" in medida:
+                print(f"  {etapa:<10} omitida: {medida['omitida']}")
+            else:
+                tamano = f", salida {medida['bytes_salida'] / 1e6:.1f} MB" if medida["bytes_salida"] else ""
+                memoria = f", {medida['memoria_max_mb']} MB RSS" if medida["memoria_max_mb"] else ""
+                unidad = "PDFs" if etapa == "renombrar" else "páginas"
+                print(f"  {etapa:<10} {medida['paginas']} {unidad} en {medida['segundos']} s "
+                      f"({medida['paginas_por_segundo']} {unidad}/s{memoria}{tamano})")
+    finally:
+        shutil.rmtree(trabajo, ignore_errors=True)
+
+    with open(args.salida, "w", encoding="utf-8") as f:
+        json.dump(resultados, f, ensure_ascii=False, indent=4)
+    print(f"Resultados guardados en {args.salida}")
+    if args.comparar:
+        with open(args.comparar, "r", encoding="utf-8") as f:
+            comparar(resultados, json.load(f))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
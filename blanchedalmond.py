@@ -1,27 +1,29 @@
+import time
+# Se toma lo antes posible para medir el arranque completo de la ventana
+INICIO_ARRANQUE = time.perf_counter()
 import os
-import re
+import sys
 import json
+import queue
+import threading
+import multiprocessing
 import tkinter as tk
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 from tkinter import filedialog, messagebox, simpledialog
-import webbrowser
-from PyPDF2 import PdfReader, PdfWriter
-
-# Intentar importar módulos opcionales
-try:
-    from pdf2image import convert_from_path
-except ImportError:
-    convert_from_path = None
-
-try:
-    from PIL import Image
-except ImportError:
-    Image = None
+from nucleo import (dividir_pdf_archivo, dividir_pdfs_carpeta, procesos_por_defecto, unir_pdfs, pdf_a_jpg,
+                    DPI_POR_DEFECTO, CALIDAD_POR_DEFECTO,
+                    unir_jpgs, agrupar_por_alumno, OperacionCancelada, compilar_patron, ETIQUETAS_NOMBRE,
+                    estimar_division, resumen_estimacion)
+import informe
+import cache_texto
 
 # --- Configuración ---
 CONFIG_FILE = "config.json"
 
+# Tiempo máximo (en segundos) hasta que la ventana se muestra por primera vez
+PRESUPUESTO_ARRANQUE = 1.0
+
 def cargar_config():
     if os.path.exists(CONFIG_FILE):
         try:
@@ -39,93 +41,28 @@ def guardar_config(config):
     except Exception as e:
         print("Error al guardar la configuración:", e)
 
-# --- Funciones comunes ---
-def extraer_nombres_pdf(ruta_archivo):
-    """Extrae nombres del PDF buscando líneas que contengan 'Alumne/a:' o 'Alumno/a:'."""
-    nombres = []
-    try:
-        reader = PdfReader(ruta_archivo)
-        for pagina in reader.pages:
-            texto = pagina.extract_text()
-            if texto:
-                coincidencias = re.findall(r'(?:Alumne/a|Alumno/a):\s*(.+)', texto)
-                nombres.extend(coincidencias)
-    except Exception as e:
-        print(f"Error al leer {ruta_archivo}: {e}")
-    return nombres
-
-def sanitizar_nombre(nombre):
-    """Sanitiza un string para usarlo como nombre de archivo válido."""
-    return re.sub(r'[\\/*?"<>|]', '_', nombre)
+def patron_configurado():
+    """Patrón del nombre del alumno según 'etiquetas_nombre' de config.json (o el predeterminado)."""
+    return compilar_patron(cargar_config().get("etiquetas_nombre") or ETIQUETAS_NOMBRE)
 
-def dividir_pdf_archivo(archivo_entrada, carpeta_salida, prefijo="pagina"):
-    """Divide un único PDF en páginas individuales usando un prefijo para el nombre."""
-    if not os.path.exists(carpeta_salida):
-        os.makedirs(carpeta_salida)
-    try:
-        reader = PdfReader(archivo_entrada)
-    except Exception as e:
-        messagebox.showerror("Error", f"Error al abrir el archivo:\n{e}")
-        return
-    total_paginas = len(reader.pages)
-    for i in range(total_paginas):
-        writer = PdfWriter()
-        writer.add_page(reader.pages[i])
-        nombre_archivo = f"{prefijo}_{i+1}.pdf"
-        ruta_salida = os.path.join(carpeta_salida, nombre_archivo)
-        try:
-            with open(ruta_salida, 'wb') as f:
-                writer.write(f)
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al guardar {ruta_salida}:\n{e}")
+def ruta_indice():
+    """
+    Ruta del índice de nombres de alumno: la clave 'indice' de config.json o la
+    predeterminada; con 'indice' vacío no se indexa (devuelve None).
+    """
+    config = cargar_config()
+    if "indice" in config:
+        return config["indice"] or None
+    from indice import RUTA_INDICE_POR_DEFECTO
+    return RUTA_INDICE_POR_DEFECTO
 
-def dividir_pdfs_carpeta(carpeta_entrada, carpeta_salida):
+def configurar_cache_texto(config):
     """
-    Para cada PDF en carpeta_entrada:
-      - Crea una subcarpeta (con el nombre del archivo sin extensión) en carpeta_salida.
-      - Divide el PDF en páginas individuales.
-    Luego renombra cada archivo usando el primer nombre extraído.
+    Activa la caché de nombres según 'cache_texto' (ruta; vacía para no usarla)
+    y 'cache_texto_mb' (tamaño máximo) de config.json, o sus valores predeterminados.
     """
-    if not os.path.exists(carpeta_salida):
-        os.makedirs(carpeta_salida)
-    archivos_pdf = [f for f in os.listdir(carpeta_entrada) if f.lower().endswith('.pdf')]
-    for archivo in archivos_pdf:
-        ruta_pdf = os.path.join(carpeta_entrada, archivo)
-        nombre_pdf = os.path.splitext(archivo)[0]
-        carpeta_pdf = os.path.join(carpeta_salida, nombre_pdf)
-        if not os.path.exists(carpeta_pdf):
-            os.makedirs(carpeta_pdf)
-        try:
-            reader = PdfReader(ruta_pdf)
-        except Exception as e:
-            print(f"Error al abrir {archivo}: {e}")
-            continue
-        total_paginas = len(reader.pages)
-        for i in range(total_paginas):
-            writer = PdfWriter()
-            writer.add_page(reader.pages[i])
-            ruta_salida = os.path.join(carpeta_pdf, f"pagina_{i+1}.pdf")
-            try:
-                with open(ruta_salida, 'wb') as salida:
-                    writer.write(salida)
-            except Exception as e:
-                print(f"Error al guardar {ruta_salida}: {e}")
-    renombrar_pdfs(carpeta_salida)
-
-def renombrar_pdfs(carpeta):
-    """Recorre recursivamente la carpeta y renombra cada PDF según el primer nombre extraído."""
-    for root_dir, _, archivos in os.walk(carpeta):
-        for archivo in archivos:
-            if archivo.lower().endswith('.pdf'):
-                ruta_archivo = os.path.join(root_dir, archivo)
-                nombres = extraer_nombres_pdf(ruta_archivo)
-                if nombres:
-                    nuevo_nombre = sanitizar_nombre(nombres[0]) + ".pdf"
-                    nueva_ruta = os.path.join(root_dir, nuevo_nombre)
-                    try:
-                        os.rename(ruta_archivo, nueva_ruta)
-                    except Exception as e:
-                        print(f"Error renombrando {ruta_archivo}: {e}")
+    ruta = config.get("cache_texto", cache_texto.RUTA_CACHE_POR_DEFECTO) or None
+    cache_texto.configurar(ruta, config.get("cache_texto_mb", cache_texto.LIMITE_POR_DEFECTO_MB))
 
 # --- Funciones de interfaz en el área principal ---
 def limpiar_contenido():
@@ -135,11 +72,13 @@ def limpiar_contenido():
 
 def mostrar_inicio():
     """Muestra la pantalla de inicio con el logo, el texto de copyright y la descripción."""
+    global label_logo
     limpiar_contenido()
-    # Mostrar logo (si existe)
+    # Mostrar logo (se carga después de pintar la ventana, ver cargar_logo)
+    label_logo = ttk.Label(main_frame)
     if imagen:
-        label_img = ttk.Label(main_frame, image=imagen)
-        label_img.pack(pady=10)
+        label_logo.configure(image=imagen)
+    label_logo.pack(pady=10)
     # Texto de copyright bajo el logo
     label_app = ttk.Label(main_frame, 
                           text="jocarsa | blanchedalmond 1.2 (c) 2025 JOCARSA - Jose Vicente Carratala Sanchis", 
@@ -158,6 +97,210 @@ def boton_volver(parent):
     btn.pack(pady=10)
     return btn
 
+def campo_procesos(form_frame, fila):
+    """Crea el campo con el número de procesos en paralelo (por defecto, uno por CPU)."""
+    ttk.Label(form_frame, text="Procesos:", font=("Ubuntu", 10)).grid(row=fila, column=0, sticky="w")
+    entry_procesos = ttk.Entry(form_frame, width=40)
+    entry_procesos.grid(row=fila, column=1, padx=5)
+    entry_procesos.insert(0, str(procesos_por_defecto()))
+    return entry_procesos
+
+def campo_incremental(form_frame, fila):
+    """Crea la casilla para omitir los PDFs que no han cambiado desde la última división."""
+    var_incremental = tk.BooleanVar(value=True)
+    ttk.Checkbutton(form_frame, text="Omitir PDFs sin cambios desde la última ejecución",
+                    variable=var_incremental).grid(row=fila, column=1, sticky="w", pady=5)
+    return var_incremental
+
+def campo_agrupar_paginas(form_frame, fila):
+    """Crea la casilla para guardar cada boletín de varias páginas en un solo archivo."""
+    var_agrupar = tk.BooleanVar(value=False)
+    ttk.Checkbutton(form_frame, text="Boletines de varias páginas (unir las páginas sin nombre a la anterior)",
+                    variable=var_agrupar).grid(row=fila, column=1, sticky="w", pady=5)
+    return var_agrupar
+
+def campo_zip(form_frame, fila):
+    """Crea la casilla para guardar todas las salidas en un único ZIP en lugar de archivos sueltos."""
+    var_zip = tk.BooleanVar(value=False)
+    ttk.Checkbutton(form_frame, text="Guardar en un único archivo ZIP (carpeta de destino + .zip)",
+                    variable=var_zip).grid(row=fila, column=1, sticky="w", pady=5)
+    return var_zip
+
+def destino_zip(carpeta, var_zip):
+    """La carpeta de destino o, con la casilla ZIP marcada, el archivo carpeta.zip."""
+    return carpeta.rstrip("/\\") + ".zip" if var_zip.get() else carpeta
+
+def leer_procesos(entry_procesos):
+    """Devuelve el número de procesos indicado, o None (y muestra un error) si no es válido."""
+    try:
+        procesos = int(entry_procesos.get().strip())
+    except ValueError:
+        procesos = 0
+    if procesos < 1:
+        messagebox.showerror("Error", "El número de procesos debe ser un entero mayor que cero.")
+        return None
+    return procesos
+
+def campo_numero(form_frame, fila, texto, valor=""):
+    """Crea un campo numérico con su etiqueta; valor vacío significa «sin límite»."""
+    ttk.Label(form_frame, text=texto, font=("Ubuntu", 10)).grid(row=fila, column=0, sticky="w")
+    entry = ttk.Entry(form_frame, width=40)
+    entry.grid(row=fila, column=1, padx=5)
+    entry.insert(0, str(valor))
+    return entry
+
+def leer_numero(entry, nombre, opcional=False):
+    """
+    Devuelve el entero positivo del campo, None si está vacío y es opcional, o
+    False (y muestra un error) si no es válido.
+    """
+    texto = entry.get().strip()
+    if not texto and opcional:
+        return None
+    try:
+        numero = int(texto)
+    except ValueError:
+        numero = 0
+    if numero < 1:
+        messagebox.showerror("Error", f"{nombre} debe ser un entero mayor que cero.")
+        return False
+    return numero
+
+def mostrar_errores_division(resultados):
+    """Muestra en un único diálogo los errores recogidos al dividir varios PDFs."""
+    errores = [error for resultado in resultados for error in resultado["errores"]]
+    if errores:
+        messagebox.showerror("Error", "\n".join(errores[:20]) +
+                             (f"\n... y {len(errores) - 20} errores más" if len(errores) > 20 else ""))
+
+def resumen_carpeta(resultados):
+    """Texto con los PDFs omitidos por no haber cambiado y los reanudados (vacío si no hay)."""
+    texto = ""
+    omitidos = sum(1 for resultado in resultados if resultado.get("omitido"))
+    if omitidos:
+        texto += f"\n{omitidos} de {len(resultados)} PDFs no habían cambiado y se han omitido."
+    reanudados = sum(1 for resultado in resultados if resultado.get("reanudado"))
+    if reanudados:
+        texto += f"\n{reanudados} PDFs se han reanudado donde se interrumpió la ejecución anterior."
+    return texto
+
+def formatear_duracion(segundos):
+    """Formatea una duración en segundos como h:mm:ss."""
+    segundos = int(segundos)
+    return f"{segundos // 3600}:{segundos % 3600 // 60:02d}:{segundos % 60:02d}"
+
+def bloquear_menus(bloquear):
+    """
+    Desactiva (o vuelve a activar) los menús que cambian de pantalla: mientras
+    corre una operación no se puede salir de su pantalla ni lanzar otra.
+    """
+    estado = "disabled" if bloquear else "normal"
+    menubar.entryconfigure("Operaciones", state=estado)
+    menu_archivo.entryconfigure("Inicio", state=estado)
+
+def ejecutar_en_segundo_plano(titulo, trabajo, al_terminar):
+    """
+    Ejecuta trabajo(progreso, cancelar) en un hilo aparte para no bloquear la ventana.
+    Muestra una barra de progreso con páginas/segundo y tiempo restante y un botón
+    para cancelar entre páginas. El hilo solo se comunica con Tk a través de una
+    cola que se consulta con root.after; al_terminar(resultado) se llama en el hilo
+    de Tk cuando el trabajo acaba bien. Hasta entonces los menús de operaciones e
+    inicio están desactivados (ver bloquear_menus).
+
+    Si config.json tiene "carpeta_informes", cada operación deja allí un informe
+    JSON con los tiempos por etapa y por archivo (ver informe.py) y, con
+    "perfilar": true, también un volcado de cProfile.
+    """
+    limpiar_contenido()
+    bloquear_menus(True)
+    ttk.Label(main_frame, text=titulo, font=("Ubuntu", 14, "bold")).pack(pady=10)
+    barra = ttk.Progressbar(main_frame, length=400, mode="determinate", bootstyle="success-striped")
+    barra.pack(pady=10)
+    label_estado = ttk.Label(main_frame, text="Preparando...", font=("Ubuntu", 10))
+    label_estado.pack(pady=5)
+
+    cola = queue.Queue()
+    cancelar = threading.Event()
+    inicio = time.monotonic()
+
+    def cancelar_trabajo():
+        cancelar.set()
+        boton_cancelar.configure(state="disabled")
+        label_estado.configure(text="Cancelando...")
+    boton_cancelar = ttk.Button(main_frame, text="Cancelar", bootstyle="danger", command=cancelar_trabajo)
+    boton_cancelar.pack(pady=10)
+
+    def progreso(hechas, total):
+        cola.put(("progreso", hechas, total))
+
+    config = cargar_config()
+    configurar_cache_texto(config)
+    carpeta_informes = config.get("carpeta_informes")
+    marca = time.strftime("%Y%m%d_%H%M%S")
+    perfil = None
+    if carpeta_informes and config.get("perfilar"):
+        perfil = os.path.join(carpeta_informes, f"perfil_{marca}.prof")
+
+    def hilo():
+        if carpeta_informes:
+            informe.iniciar(titulo)
+            os.makedirs(carpeta_informes, exist_ok=True)
+        final = ("error", RuntimeError("la operación terminó sin resultado"))
+        try:
+            with informe.perfilar(perfil):
+                resultado = trabajo(progreso, cancelar)
+            final = ("fin", resultado)
+        except OperacionCancelada:
+            informe.fallo(None, "Operación cancelada")
+            final = ("cancelado", None)
+        except Exception as e:
+            informe.fallo(None, e)
+            final = ("error", e)
+        finally:
+            cache_texto.volcar()
+            if carpeta_informes:
+                try:
+                    informe.terminar().guardar(os.path.join(carpeta_informes, f"informe_{marca}.json"))
+                except Exception as e:
+                    print("Error al guardar el informe:", e)
+            # Solo al final: al_terminar puede lanzar otra operación con su propio informe
+            cola.put(final)
+
+    def sondear():
+        ultimo = None
+        while True:
+            try:
+                mensaje = cola.get_nowait()
+            except queue.Empty:
+                break
+            if mensaje[0] == "progreso":
+                ultimo = mensaje
+                continue
+            bloquear_menus(False)
+            if mensaje[0] == "fin":
+                al_terminar(mensaje[1])
+            elif mensaje[0] == "cancelado":
+                messagebox.showinfo("Cancelado", "La operación se ha cancelado.")
+                mostrar_inicio()
+            else:
+                messagebox.showerror("Error", f"Error durante la operación:\n{mensaje[1]}")
+                mostrar_inicio()
+            return
+        # La cola se sigue vaciando aunque la pantalla de progreso ya no exista
+        if ultimo is not None and not cancelar.is_set() and barra.winfo_exists():
+            _, hechas, total = ultimo
+            transcurrido = time.monotonic() - inicio
+            ritmo = hechas / transcurrido if transcurrido > 0 else 0
+            barra.configure(maximum=max(total, 1), value=hechas)
+            texto = f"{hechas} de {total} páginas  |  {ritmo:.1f} páginas/s"
+            if ritmo > 0:
+                texto += f"  |  Restante: {formatear_duracion((total - hechas) / ritmo)}"
+            label_estado.configure(text=texto)
+        root.after(100, sondear)
+
+    threading.Thread(target=hilo, daemon=True).start()
+    root.after(100, sondear)
+
 def mostrar_dividir_boletines():
     limpiar_contenido()
     titulo = ttk.Label(main_frame, text="Dividir PDFs en Carpeta", font=("Ubuntu", 14, "bold"))
@@ -192,17 +335,62 @@ def mostrar_dividir_boletines():
             entry_destino.insert(0, carpeta)
     ttk.Button(form_frame, text="Examinar", command=buscar_destino).grid(row=1, column=2, padx=5)
     
-    def ejecutar():
+    # Procesos en paralelo
+    entry_procesos = campo_procesos(form_frame, 2)
+    var_incremental = campo_incremental(form_frame, 3)
+    var_agrupar = campo_agrupar_paginas(form_frame, 4)
+    var_zip = campo_zip(form_frame, 5)
+    
+    def leer_opciones():
+        """Opciones del formulario, o None (tras avisar) si falta alguna."""
         origen = entry_origen.get().strip()
         destino = entry_destino.get().strip()
         if not origen or not destino:
             messagebox.showerror("Error", "Debe seleccionar ambas carpetas.")
+            return None
+        procesos = leer_procesos(entry_procesos)
+        if procesos is None:
+            return None
+        return {"origen": origen, "destino": destino_zip(destino, var_zip), "procesos": procesos,
+                "incremental": var_incremental.get(), "agrupar_paginas": var_agrupar.get(),
+                "patron": patron_configurado()}
+
+    def dividir(opciones):
+        indice = ruta_indice()
+        def trabajo(progreso, cancelar):
+            return dividir_pdfs_carpeta(opciones["origen"], opciones["destino"], procesos=opciones["procesos"],
+                                        progreso=progreso, cancelar=cancelar, incremental=opciones["incremental"],
+                                        patron=opciones["patron"], indice=indice,
+                                        agrupar_paginas=opciones["agrupar_paginas"])
+        def al_terminar(resultados):
+            mostrar_errores_division(resultados)
+            messagebox.showinfo("Completado", "El procesamiento de PDFs ha finalizado." + resumen_carpeta(resultados))
+            mostrar_inicio()
+        ejecutar_en_segundo_plano("Dividiendo PDFs...", trabajo, al_terminar)
+
+    def ejecutar():
+        opciones = leer_opciones()
+        if opciones is not None:
+            dividir(opciones)
+
+    def estimar():
+        opciones = leer_opciones()
+        if opciones is None:
             return
-        dividir_pdfs_carpeta(origen, destino)
-        messagebox.showinfo("Completado", "El procesamiento de PDFs ha finalizado.")
-        mostrar_inicio()
-        
+        def trabajo(progreso, cancelar):
+            # El progreso de la estimación va por PDFs abiertos, no por páginas: no se muestra
+            return estimar_division(opciones["origen"], opciones["destino"], procesos=opciones["procesos"],
+                                    incremental=opciones["incremental"], patron=opciones["patron"],
+                                    agrupar_paginas=opciones["agrupar_paginas"], cancelar=cancelar)
+        def al_terminar(estimacion):
+            if messagebox.askyesno("Estimación", resumen_estimacion(estimacion) + "\n\n¿Dividir ahora?"):
+                dividir(opciones)
+            else:
+                mostrar_inicio()
+        ejecutar_en_segundo_plano("Estimando...", trabajo, al_terminar)
+
     ttk.Button(main_frame, text="Ejecutar", bootstyle="success", command=ejecutar).pack(pady=10)
+    ttk.Button(main_frame, text="Estimar sin dividir", bootstyle="info", command=estimar).pack(pady=5)
     boton_volver(main_frame)
 
 def mostrar_dividir_un_archivo():
@@ -237,18 +425,34 @@ def mostrar_dividir_un_archivo():
             entry_destino.insert(0, carpeta)
     ttk.Button(form_frame, text="Examinar", command=buscar_destino).grid(row=1, column=2, padx=5)
     
+    # Procesos en paralelo
+    entry_procesos = campo_procesos(form_frame, 2)
+    var_agrupar = campo_agrupar_paginas(form_frame, 3)
+    var_zip = campo_zip(form_frame, 4)
+    
     def ejecutar():
         archivo = entry_archivo.get().strip()
         destino = entry_destino.get().strip()
         if not archivo or not destino:
             messagebox.showerror("Error", "Debe seleccionar el archivo y la carpeta de destino.")
             return
+        procesos = leer_procesos(entry_procesos)
+        if procesos is None:
+            return
         nombre_base = os.path.splitext(os.path.basename(archivo))[0]
-        carpeta_resultado = os.path.join(destino, nombre_base)
-        dividir_pdf_archivo(archivo, carpeta_resultado, prefijo="pagina")
-        renombrar_pdfs(carpeta_resultado)
-        messagebox.showinfo("Completado", "El procesamiento del PDF ha finalizado.")
-        mostrar_inicio()
+        carpeta_resultado = destino_zip(os.path.join(destino, nombre_base), var_zip)
+        agrupar_paginas = var_agrupar.get()
+        patron = patron_configurado()
+        indice = ruta_indice()
+        def trabajo(progreso, cancelar):
+            return dividir_pdf_archivo(archivo, carpeta_resultado, prefijo="pagina", nombrar_por_alumno=True,
+                                       procesos=procesos, progreso=progreso, cancelar=cancelar, patron=patron,
+                                       indice=indice, agrupar_paginas=agrupar_paginas)
+        def al_terminar(resultado):
+            mostrar_errores_division([resultado])
+            messagebox.showinfo("Completado", "El procesamiento del PDF ha finalizado.")
+            mostrar_inicio()
+        ejecutar_en_segundo_plano("Dividiendo PDF...", trabajo, al_terminar)
         
     ttk.Button(main_frame, text="Ejecutar", bootstyle="success", command=ejecutar).pack(pady=10)
     boton_volver(main_frame)
@@ -291,6 +495,11 @@ def mostrar_dividir_pdfs_prefijo():
     entry_prefijo = ttk.Entry(form_frame, width=40)
     entry_prefijo.grid(row=2, column=1, padx=5)
     
+    # Procesos en paralelo
+    entry_procesos = campo_procesos(form_frame, 3)
+    var_incremental = campo_incremental(form_frame, 4)
+    var_zip = campo_zip(form_frame, 5)
+    
     def ejecutar():
         origen = entry_origen.get().strip()
         destino = entry_destino.get().strip()
@@ -298,30 +507,21 @@ def mostrar_dividir_pdfs_prefijo():
         if not origen or not destino or not prefijo:
             messagebox.showerror("Error", "Debe completar todos los campos.")
             return
-        archivos_pdf = [f for f in os.listdir(origen) if f.lower().endswith('.pdf')]
-        for archivo in archivos_pdf:
-            ruta_pdf = os.path.join(origen, archivo)
-            nombre_pdf = os.path.splitext(archivo)[0]
-            carpeta_pdf = os.path.join(destino, nombre_pdf)
-            if not os.path.exists(carpeta_pdf):
-                os.makedirs(carpeta_pdf)
-            try:
-                reader = PdfReader(ruta_pdf)
-            except Exception as e:
-                print(f"Error al abrir {archivo}: {e}")
-                continue
-            total_paginas = len(reader.pages)
-            for i in range(total_paginas):
-                writer = PdfWriter()
-                writer.add_page(reader.pages[i])
-                ruta_salida = os.path.join(carpeta_pdf, f"{prefijo}_{i+1}.pdf")
-                try:
-                    with open(ruta_salida, 'wb') as f:
-                        writer.write(f)
-                except Exception as e:
-                    print(f"Error al guardar {ruta_salida}: {e}")
-        messagebox.showinfo("Completado", "La división de PDFs en carpeta ha finalizado.")
-        mostrar_inicio()
+        destino = destino_zip(destino, var_zip)
+        procesos = leer_procesos(entry_procesos)
+        if procesos is None:
+            return
+        incremental = var_incremental.get()
+        def trabajo(progreso, cancelar):
+            return dividir_pdfs_carpeta(origen, destino, prefijo=prefijo, nombrar_por_alumno=False,
+                                        procesos=procesos, progreso=progreso, cancelar=cancelar,
+                                        incremental=incremental)
+        def al_terminar(resultados):
+            mostrar_errores_division(resultados)
+            messagebox.showinfo("Completado", "La división de PDFs en carpeta ha finalizado."
+                                + resumen_carpeta(resultados))
+            mostrar_inicio()
+        ejecutar_en_segundo_plano("Dividiendo PDFs...", trabajo, al_terminar)
     
     ttk.Button(main_frame, text="Ejecutar", bootstyle="success", command=ejecutar).pack(pady=10)
     boton_volver(main_frame)
@@ -363,6 +563,10 @@ def mostrar_dividir_pdf_unico_prefijo():
     entry_prefijo = ttk.Entry(form_frame, width=40)
     entry_prefijo.grid(row=2, column=1, padx=5)
     
+    # Procesos en paralelo
+    entry_procesos = campo_procesos(form_frame, 3)
+    var_zip = campo_zip(form_frame, 4)
+    
     def ejecutar():
         archivo = entry_archivo.get().strip()
         destino = entry_destino.get().strip()
@@ -370,11 +574,19 @@ def mostrar_dividir_pdf_unico_prefijo():
         if not archivo or not destino or not prefijo:
             messagebox.showerror("Error", "Debe completar todos los campos.")
             return
+        procesos = leer_procesos(entry_procesos)
+        if procesos is None:
+            return
         nombre_base = os.path.splitext(os.path.basename(archivo))[0]
-        carpeta_resultado = os.path.join(destino, nombre_base)
-        dividir_pdf_archivo(archivo, carpeta_resultado, prefijo=prefijo)
-        messagebox.showinfo("Completado", "La división del PDF ha finalizado.")
-        mostrar_inicio()
+        carpeta_resultado = destino_zip(os.path.join(destino, nombre_base), var_zip)
+        def trabajo(progreso, cancelar):
+            return dividir_pdf_archivo(archivo, carpeta_resultado, prefijo=prefijo, procesos=procesos,
+                                       progreso=progreso, cancelar=cancelar)
+        def al_terminar(resultado):
+            mostrar_errores_division([resultado])
+            messagebox.showinfo("Completado", "La división del PDF ha finalizado.")
+            mostrar_inicio()
+        ejecutar_en_segundo_plano("Dividiendo PDF...", trabajo, al_terminar)
         
     ttk.Button(main_frame, text="Ejecutar", bootstyle="success", command=ejecutar).pack(pady=10)
     boton_volver(main_frame)
@@ -411,25 +623,41 @@ def mostrar_pdf_a_jpg():
             entry_destino.insert(0, carpeta)
     ttk.Button(form_frame, text="Examinar", command=buscar_destino).grid(row=1, column=2, padx=5)
     
+    # Opciones de la rasterización
+    entry_dpi = campo_numero(form_frame, 2, "Resolución (DPI):", DPI_POR_DEFECTO)
+    entry_calidad = campo_numero(form_frame, 3, "Calidad JPEG (1-95):", CALIDAD_POR_DEFECTO)
+    entry_primera = campo_numero(form_frame, 4, "Desde la página:")
+    entry_ultima = campo_numero(form_frame, 5, "Hasta la página:")
+    entry_procesos = campo_procesos(form_frame, 6)
+    var_gris = tk.BooleanVar(value=False)
+    ttk.Checkbutton(form_frame, text="Escala de grises", variable=var_gris).grid(row=7, column=1, sticky="w", pady=5)
+    var_zip = campo_zip(form_frame, 8)
+    
     def ejecutar():
-        if convert_from_path is None:
-            messagebox.showerror("Error", "El módulo pdf2image no está instalado.")
-            return
         archivo = entry_archivo.get().strip()
         destino = entry_destino.get().strip()
         if not archivo or not destino:
             messagebox.showerror("Error", "Debe seleccionar el archivo PDF y la carpeta de destino.")
             return
-        try:
-            paginas = convert_from_path(archivo)
-            for i, pagina in enumerate(paginas):
-                ruta_salida = os.path.join(destino, f"pagina_{i+1}.jpg")
-                pagina.save(ruta_salida, "JPEG")
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al convertir PDF a JPG:\n{e}")
+        destino = destino_zip(destino, var_zip)
+        opciones = {}
+        for clave, entry, nombre, opcional in (("dpi", entry_dpi, "La resolución", False),
+                                               ("calidad", entry_calidad, "La calidad", False),
+                                               ("primera", entry_primera, "La primera página", True),
+                                               ("ultima", entry_ultima, "La última página", True)):
+            opciones[clave] = leer_numero(entry, nombre, opcional)
+            if opciones[clave] is False:
+                return
+        opciones["procesos"] = leer_procesos(entry_procesos)
+        if opciones["procesos"] is None:
             return
-        messagebox.showinfo("Completado", "La conversión de PDF a JPG ha finalizado.")
-        mostrar_inicio()
+        opciones["gris"] = var_gris.get()
+        def trabajo(progreso, cancelar):
+            return pdf_a_jpg(archivo, destino, progreso=progreso, cancelar=cancelar, **opciones)
+        def al_terminar(total_paginas):
+            messagebox.showinfo("Completado", "La conversión de PDF a JPG ha finalizado.")
+            mostrar_inicio()
+        ejecutar_en_segundo_plano("Convirtiendo PDF a JPG...", trabajo, al_terminar)
         
     ttk.Button(main_frame, text="Ejecutar", bootstyle="success", command=ejecutar).pack(pady=10)
     boton_volver(main_frame)
@@ -438,7 +666,8 @@ def mostrar_unir_pdfs():
     limpiar_contenido()
     titulo = ttk.Label(main_frame, text="Unir PDFs en un Solo PDF", font=("Ubuntu", 14, "bold"))
     titulo.pack(pady=10)
-    instrucciones = ("Seleccione los archivos PDF a unir y especifique el archivo de destino para guardar el PDF combinado.")
+    instrucciones = ("Seleccione los archivos PDF a unir (o una carpeta con todos ellos) y especifique el archivo "
+                     "de destino para guardar el PDF combinado.")
     ttk.Label(main_frame, text=instrucciones, wraplength=400, font=("Ubuntu", 10)).pack(pady=5)
     
     form_frame = ttk.Frame(main_frame)
@@ -454,6 +683,12 @@ def mostrar_unir_pdfs():
             entry_archivos.delete(0, tk.END)
             entry_archivos.insert(0, ";".join(archivos))
     ttk.Button(form_frame, text="Examinar", command=buscar_archivos).grid(row=0, column=2, padx=5)
+    def buscar_carpeta():
+        carpeta = filedialog.askdirectory(title="Seleccione Carpeta con los PDFs")
+        if carpeta:
+            entry_archivos.delete(0, tk.END)
+            entry_archivos.insert(0, carpeta)
+    ttk.Button(form_frame, text="Carpeta", command=buscar_carpeta).grid(row=0, column=3, padx=5)
     
     # Archivo PDF de Destino
     ttk.Label(form_frame, text="Archivo PDF de Destino:", font=("Ubuntu", 10)).grid(row=1, column=0, sticky="w")
@@ -474,23 +709,12 @@ def mostrar_unir_pdfs():
             messagebox.showerror("Error", "Debe seleccionar los archivos de origen y el archivo de destino.")
             return
         archivos = lista_archivos.split(";")
-        writer = PdfWriter()
-        for archivo in archivos:
-            try:
-                reader = PdfReader(archivo)
-                for pagina in reader.pages:
-                    writer.add_page(pagina)
-            except Exception as e:
-                messagebox.showerror("Error", f"Error al procesar {archivo}:\n{e}")
-                return
-        try:
-            with open(destino, 'wb') as f:
-                writer.write(f)
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al guardar el PDF combinado:\n{e}")
-            return
-        messagebox.showinfo("Completado", "La unión de PDFs ha finalizado.")
-        mostrar_inicio()
+        def trabajo(progreso, cancelar):
+            return unir_pdfs(archivos, destino, progreso=progreso, cancelar=cancelar)
+        def al_terminar(total_paginas):
+            messagebox.showinfo("Completado", "La unión de PDFs ha finalizado.")
+            mostrar_inicio()
+        ejecutar_en_segundo_plano("Uniendo PDFs...", trabajo, al_terminar)
         
     ttk.Button(main_frame, text="Ejecutar", bootstyle="success", command=ejecutar).pack(pady=10)
     boton_volver(main_frame)
@@ -499,7 +723,8 @@ def mostrar_unir_jpgs():
     limpiar_contenido()
     titulo = ttk.Label(main_frame, text="Unir JPGs en un PDF", font=("Ubuntu", 14, "bold"))
     titulo.pack(pady=10)
-    instrucciones = ("Seleccione las imágenes JPG a unir y especifique el archivo de destino para guardar el PDF resultante.")
+    instrucciones = ("Seleccione las imágenes JPG a unir (o una carpeta con todas ellas) y especifique el archivo "
+                     "de destino para guardar el PDF resultante. Las imágenes se incrustan sin recomprimir.")
     ttk.Label(main_frame, text=instrucciones, wraplength=400, font=("Ubuntu", 10)).pack(pady=5)
     
     form_frame = ttk.Frame(main_frame)
@@ -516,6 +741,12 @@ def mostrar_unir_jpgs():
             entry_archivos.delete(0, tk.END)
             entry_archivos.insert(0, ";".join(archivos))
     ttk.Button(form_frame, text="Examinar", command=buscar_archivos).grid(row=0, column=2, padx=5)
+    def buscar_carpeta():
+        carpeta = filedialog.askdirectory(title="Seleccione Carpeta con las imágenes")
+        if carpeta:
+            entry_archivos.delete(0, tk.END)
+            entry_archivos.insert(0, carpeta)
+    ttk.Button(form_frame, text="Carpeta", command=buscar_carpeta).grid(row=0, column=3, padx=5)
     
     # Archivo PDF de Destino
     ttk.Label(form_frame, text="Archivo PDF de Destino:", font=("Ubuntu", 10)).grid(row=1, column=0, sticky="w")
@@ -536,75 +767,304 @@ def mostrar_unir_jpgs():
             messagebox.showerror("Error", "Debe seleccionar las imágenes de origen y el archivo de destino.")
             return
         archivos = lista_archivos.split(";")
-        try:
-            imagenes = [Image.open(a).convert('RGB') for a in archivos]
-            if imagenes:
-                imagenes[0].save(destino, save_all=True, append_images=imagenes[1:])
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al unir imágenes en PDF:\n{e}")
+        def trabajo(progreso, cancelar):
+            return unir_jpgs(archivos, destino, progreso=progreso, cancelar=cancelar)
+        def al_terminar(total_imagenes):
+            messagebox.showinfo("Completado", "La unión de imágenes en PDF ha finalizado.")
+            mostrar_inicio()
+        ejecutar_en_segundo_plano("Uniendo imágenes en PDF...", trabajo, al_terminar)
+        
+    ttk.Button(main_frame, text="Ejecutar", bootstyle="success", command=ejecutar).pack(pady=10)
+    boton_volver(main_frame)
+
+def mostrar_agrupar_por_alumno():
+    limpiar_contenido()
+    titulo = ttk.Label(main_frame, text="Un PDF por Alumno (Varias Evaluaciones)", font=("Ubuntu", 14, "bold"))
+    titulo.pack(pady=10)
+    instrucciones = ("Añada las carpetas con los PDFs de cada evaluación, en orden, y la carpeta de destino. "
+                     "Se creará un PDF por alumno con todas sus páginas.")
+    ttk.Label(main_frame, text=instrucciones, wraplength=400, font=("Ubuntu", 10)).pack(pady=5)
+    
+    form_frame = ttk.Frame(main_frame)
+    form_frame.pack(padx=20, pady=20)
+    
+    # Carpetas o PDFs de origen (separados por punto y coma)
+    ttk.Label(form_frame, text="Orígenes:", font=("Ubuntu", 10)).grid(row=0, column=0, sticky="w")
+    entry_origenes = ttk.Entry(form_frame, width=40)
+    entry_origenes.grid(row=0, column=1, padx=5)
+    def anadir_carpeta():
+        carpeta = filedialog.askdirectory(title="Añadir Carpeta de una Evaluación")
+        if carpeta:
+            actual = entry_origenes.get().strip()
+            entry_origenes.delete(0, tk.END)
+            entry_origenes.insert(0, f"{actual};{carpeta}" if actual else carpeta)
+    ttk.Button(form_frame, text="Añadir Carpeta", command=anadir_carpeta).grid(row=0, column=2, padx=5)
+    
+    # Carpeta de Destino
+    ttk.Label(form_frame, text="Carpeta de Destino:", font=("Ubuntu", 10)).grid(row=1, column=0, sticky="w")
+    entry_destino = ttk.Entry(form_frame, width=40)
+    entry_destino.grid(row=1, column=1, padx=5)
+    def buscar_destino():
+        carpeta = filedialog.askdirectory(title="Seleccione Carpeta de Destino")
+        if carpeta:
+            entry_destino.delete(0, tk.END)
+            entry_destino.insert(0, carpeta)
+    ttk.Button(form_frame, text="Examinar", command=buscar_destino).grid(row=1, column=2, padx=5)
+    
+    # Procesos en paralelo
+    entry_procesos = campo_procesos(form_frame, 2)
+    var_agrupar = campo_agrupar_paginas(form_frame, 3)
+    
+    def ejecutar():
+        origenes = [ruta for ruta in entry_origenes.get().split(";") if ruta.strip()]
+        destino = entry_destino.get().strip()
+        if not origenes or not destino:
+            messagebox.showerror("Error", "Debe indicar los orígenes y la carpeta de destino.")
             return
-        messagebox.showinfo("Completado", "La unión de imágenes en PDF ha finalizado.")
-        mostrar_inicio()
+        procesos = leer_procesos(entry_procesos)
+        if procesos is None:
+            return
+        agrupar_paginas = var_agrupar.get()
+        patron = patron_configurado()
+        indice = ruta_indice()
+        def trabajo(progreso, cancelar):
+            return agrupar_por_alumno(origenes, destino, patron=patron, procesos=procesos, progreso=progreso,
+                                      cancelar=cancelar, indice=indice, agrupar_paginas=agrupar_paginas)
+        def al_terminar(resultado):
+            mostrar_errores_division([resultado])
+            mensaje = f"Se han creado {len(resultado['alumnos'])} PDFs con {resultado['paginas']} páginas."
+            if resultado["sin_nombre"]:
+                mensaje += f"\n{len(resultado['sin_nombre'])} páginas sin nombre de alumno no se han copiado."
+            messagebox.showinfo("Completado", mensaje)
+            mostrar_inicio()
+        ejecutar_en_segundo_plano("Agrupando por alumno...", trabajo, al_terminar)
         
     ttk.Button(main_frame, text="Ejecutar", bootstyle="success", command=ejecutar).pack(pady=10)
     boton_volver(main_frame)
 
+def mostrar_vigilar_carpeta():
+    limpiar_contenido()
+    titulo = ttk.Label(main_frame, text="Vigilar Carpeta de Origen", font=("Ubuntu", 14, "bold"))
+    titulo.pack(pady=10)
+    instrucciones = ("Los PDFs que lleguen a la carpeta de origen se dividirán por alumno en la carpeta de destino "
+                     "en cuanto terminen de copiarse. Pulse Cancelar para dejar de vigilar.")
+    ttk.Label(main_frame, text=instrucciones, wraplength=400, font=("Ubuntu", 10)).pack(pady=5)
+    
+    form_frame = ttk.Frame(main_frame)
+    form_frame.pack(padx=20, pady=20)
+    config = cargar_config()
+    
+    # Carpeta de Origen
+    ttk.Label(form_frame, text="Carpeta de Origen:", font=("Ubuntu", 10)).grid(row=0, column=0, sticky="w")
+    entry_origen = ttk.Entry(form_frame, width=40)
+    entry_origen.grid(row=0, column=1, padx=5)
+    entry_origen.insert(0, config.get("carpeta_origen", ""))
+    def buscar_origen():
+        carpeta = filedialog.askdirectory(title="Seleccione Carpeta de Origen")
+        if carpeta:
+            entry_origen.delete(0, tk.END)
+            entry_origen.insert(0, carpeta)
+    ttk.Button(form_frame, text="Examinar", command=buscar_origen).grid(row=0, column=2, padx=5)
+    
+    # Carpeta de Destino
+    ttk.Label(form_frame, text="Carpeta de Destino:", font=("Ubuntu", 10)).grid(row=1, column=0, sticky="w")
+    entry_destino = ttk.Entry(form_frame, width=40)
+    entry_destino.grid(row=1, column=1, padx=5)
+    entry_destino.insert(0, config.get("carpeta_destino", ""))
+    def buscar_destino():
+        carpeta = filedialog.askdirectory(title="Seleccione Carpeta de Destino")
+        if carpeta:
+            entry_destino.delete(0, tk.END)
+            entry_destino.insert(0, carpeta)
+    ttk.Button(form_frame, text="Examinar", command=buscar_destino).grid(row=1, column=2, padx=5)
+    
+    # Procesos en paralelo
+    entry_procesos = campo_procesos(form_frame, 2)
+    var_agrupar = campo_agrupar_paginas(form_frame, 3)
+    
+    def ejecutar():
+        origen = entry_origen.get().strip()
+        destino = entry_destino.get().strip()
+        if not origen or not destino:
+            messagebox.showerror("Error", "Debe seleccionar ambas carpetas.")
+            return
+        procesos = leer_procesos(entry_procesos)
+        if procesos is None:
+            return
+        # Se recuerdan para la próxima vez (y para "python cli.py watch")
+        config = cargar_config()
+        config["carpeta_origen"] = origen
+        config["carpeta_destino"] = destino
+        guardar_config(config)
+        agrupar_paginas = var_agrupar.get()
+        patron = patron_configurado()
+        indice = ruta_indice()
+        def trabajo(progreso, cancelar):
+            from vigilancia import vigilar_carpeta
+            return vigilar_carpeta(origen, destino, procesos=procesos, patron=patron, indice=indice,
+                                   agrupar_paginas=agrupar_paginas, progreso=progreso, cancelar=cancelar)
+        def al_terminar(total):
+            messagebox.showinfo("Vigilancia terminada", f"Se han dividido {total} PDFs nuevos.")
+            mostrar_inicio()
+        ejecutar_en_segundo_plano("Vigilando la carpeta de origen...", trabajo, al_terminar)
+        
+    ttk.Button(main_frame, text="Empezar", bootstyle="success", command=ejecutar).pack(pady=10)
+    boton_volver(main_frame)
+
+def mostrar_buscar_alumno():
+    limpiar_contenido()
+    titulo = ttk.Label(main_frame, text="Buscar Alumno", font=("Ubuntu", 14, "bold"))
+    titulo.pack(pady=10)
+    instrucciones = ("Escriba parte del nombre del alumno para encontrar sus boletines en todos los PDFs divididos "
+                     "o renombrados. Doble clic en un resultado para abrir el archivo.")
+    ttk.Label(main_frame, text=instrucciones, wraplength=400, font=("Ubuntu", 10)).pack(pady=5)
+    
+    indice = ruta_indice()
+    entry_busqueda = ttk.Entry(main_frame, width=50)
+    entry_busqueda.pack(pady=5)
+    entry_busqueda.focus_set()
+    
+    columnas = ("nombre", "origen", "pagina", "fecha")
+    tabla = ttk.Treeview(main_frame, columns=columnas, show="headings", height=12)
+    for columna, texto, ancho in (("nombre", "Alumno", 200), ("origen", "PDF de origen", 260),
+                                  ("pagina", "Página", 60), ("fecha", "Fecha", 140)):
+        tabla.heading(columna, text=texto)
+        tabla.column(columna, width=ancho, anchor="w")
+    tabla.pack(padx=20, pady=10, fill="both", expand=True)
+    label_estado = ttk.Label(main_frame, text="", font=("Ubuntu", 10))
+    label_estado.pack(pady=5)
+    salidas = {}
+    
+    def buscar_alumno(evento=None):
+        from indice import buscar
+        tabla.delete(*tabla.get_children())
+        salidas.clear()
+        if indice is None:
+            label_estado.configure(text="El índice de nombres está desactivado en config.json.")
+            return
+        try:
+            filas = buscar(indice, entry_busqueda.get())
+        except Exception as e:
+            label_estado.configure(text=f"Error al consultar el índice: {e}")
+            return
+        for fila in filas:
+            pagina = "Archivo" if fila["pagina"] == 0 else fila["pagina"]
+            elemento = tabla.insert("", tk.END, values=(fila["nombre"], os.path.basename(fila["origen"]),
+                                                        pagina, fila["fecha"].replace("T", " ")))
+            salidas[elemento] = fila["salida"] or fila["origen"]
+        label_estado.configure(text=f"{len(filas)} resultados")
+    
+    def abrir_resultado(evento):
+        import webbrowser
+        seleccion = tabla.selection()
+        if seleccion and os.path.exists(salidas[seleccion[0]]):
+            webbrowser.open("file://" + os.path.abspath(salidas[seleccion[0]]))
+        elif seleccion:
+            messagebox.showerror("Error", f"El archivo ya no existe:\n{salidas[seleccion[0]]}")
+    
+    entry_busqueda.bind("<KeyRelease>", buscar_alumno)
+    tabla.bind("<Double-1>", abrir_resultado)
+    boton_volver(main_frame)
+
 # --- Funciones del Menú ---
 def salir():
     root.quit()
 
 def ayuda_en_linea():
+    import webbrowser
     webbrowser.open("https://github.com/jocarsa/jocarsa-blanchedalmond")
 
 def acerca_de():
+    import webbrowser
     webbrowser.open("https://josevicentecarratala.com/")
 
+# --- Arranque ---
+def cargar_logo():
+    """Carga el logo cuando la ventana ya está pintada y lo muestra si seguimos en el inicio."""
+    global imagen
+    try:
+        imagen = tk.PhotoImage(file="blanchedalmond.png")
+    except Exception as e:
+        print("Error al cargar la imagen:", e)
+        return
+    if label_logo is not None and label_logo.winfo_exists():
+        label_logo.configure(image=imagen)
+
+def registrar_arranque(solo_medir):
+    """
+    Mide el tiempo desde el inicio del proceso hasta que la ventana se ha pintado
+    y avisa si supera PRESUPUESTO_ARRANQUE. Con solo_medir (--medir-arranque) muestra
+    la medida y cierra la aplicación, devolviendo un error si no se cumple el presupuesto.
+    """
+    global codigo_salida
+    root.update_idletasks()
+    duracion = time.perf_counter() - INICIO_ARRANQUE
+    if solo_medir:
+        print(f"Arranque: {duracion * 1000:.0f} ms (presupuesto: {PRESUPUESTO_ARRANQUE * 1000:.0f} ms)")
+        codigo_salida = 0 if duracion <= PRESUPUESTO_ARRANQUE else 1
+        root.quit()
+    elif duracion > PRESUPUESTO_ARRANQUE:
+        print(f"Aviso: el arranque ha tardado {duracion * 1000:.0f} ms "
+              f"(presupuesto: {PRESUPUESTO_ARRANQUE * 1000:.0f} ms)")
+
 # --- Ventana principal ---
-root = ttk.Window(themename="flatly")
-root.title("jocarsa | blanchedalmond")
-root.geometry("1024x768")
-
-# Aplicar la fuente Ubuntu globalmente
-style = ttk.Style("flatly")
-style.configure('.', font=("Ubuntu", 10))
-
-# Intentar cargar la imagen
-try:
-    imagen = tk.PhotoImage(file="blanchedalmond.png")
-except Exception as e:
-    print("Error al cargar la imagen:", e)
+if __name__ == "__main__":
+    # Necesario para que los procesos trabajadores no vuelvan a crear la ventana
+    multiprocessing.freeze_support()
+
+    root = ttk.Window(themename="flatly")
+    root.title("jocarsa | blanchedalmond")
+    root.geometry("1024x768")
+
+    # Aplicar la fuente Ubuntu globalmente
+    style = ttk.Style("flatly")
+    style.configure('.', font=("Ubuntu", 10))
+
+    # La imagen se carga en cargar_logo, una vez pintada la ventana
     imagen = None
+    label_logo = None
+
+    # Crear la barra de menú
+    menubar = tk.Menu(root)
+    menu_archivo = tk.Menu(menubar, tearoff=0)
+    # --- Nuevo comando para volver a la pantalla de inicio ---
+    menu_archivo.add_command(label="Inicio", command=mostrar_inicio)
+    menu_archivo.add_command(label="Salir", command=salir)
+    menubar.add_cascade(label="Archivo", menu=menu_archivo)
+
+    menu_operaciones = tk.Menu(menubar, tearoff=0)
+    menu_operaciones.add_command(label="Dividir Boletines (Carpeta)", command=mostrar_dividir_boletines)
+    menu_operaciones.add_command(label="Dividir un PDF (Boletines)", command=mostrar_dividir_un_archivo)
+    menu_operaciones.add_command(label="Dividir PDFs en Carpeta (Prefijo Personalizado)", command=mostrar_dividir_pdfs_prefijo)
+    menu_operaciones.add_command(label="Dividir un PDF (Prefijo Personalizado)", command=mostrar_dividir_pdf_unico_prefijo)
+    menu_operaciones.add_command(label="Convertir PDF a JPG", command=mostrar_pdf_a_jpg)
+    menu_operaciones.add_command(label="Unir PDFs en un Solo PDF", command=mostrar_unir_pdfs)
+    menu_operaciones.add_command(label="Unir JPGs en un PDF", command=mostrar_unir_jpgs)
+    menu_operaciones.add_command(label="Un PDF por Alumno (Varias Evaluaciones)", command=mostrar_agrupar_por_alumno)
+    menu_operaciones.add_separator()
+    menu_operaciones.add_command(label="Vigilar Carpeta de Origen", command=mostrar_vigilar_carpeta)
+    menu_operaciones.add_command(label="Buscar Alumno", command=mostrar_buscar_alumno)
+    menubar.add_cascade(label="Operaciones", menu=menu_operaciones)
+
+    menu_ayuda = tk.Menu(menubar, tearoff=0)
+    menu_ayuda.add_command(label="Ayuda en Línea", command=ayuda_en_linea)
+    menu_ayuda.add_command(label="Acerca de la aplicación", command=acerca_de)
+    menubar.add_cascade(label="Ayuda", menu=menu_ayuda)
+
+    root.config(menu=menubar)
+
+    # Área principal para mostrar la interfaz (contenido dinámico)
+    main_frame = ttk.Frame(root)
+    main_frame.pack(expand=True, fill="both", padx=20, pady=20)
+
+    # Mostrar pantalla de inicio
+    mostrar_inicio()
+
+    solo_medir = "--medir-arranque" in sys.argv[1:]
+    codigo_salida = 0
+    root.after_idle(registrar_arranque, solo_medir)
+    if not solo_medir:
+        root.after_idle(cargar_logo)
 
-# Crear la barra de menú
-menubar = tk.Menu(root)
-menu_archivo = tk.Menu(menubar, tearoff=0)
-# --- Nuevo comando para volver a la pantalla de inicio ---
-menu_archivo.add_command(label="Inicio", command=mostrar_inicio)
-menu_archivo.add_command(label="Salir", command=salir)
-menubar.add_cascade(label="Archivo", menu=menu_archivo)
-
-menu_operaciones = tk.Menu(menubar, tearoff=0)
-menu_operaciones.add_command(label="Dividir Boletines (Carpeta)", command=mostrar_dividir_boletines)
-menu_operaciones.add_command(label="Dividir un PDF (Boletines)", command=mostrar_dividir_un_archivo)
-menu_operaciones.add_command(label="Dividir PDFs en Carpeta (Prefijo Personalizado)", command=mostrar_dividir_pdfs_prefijo)
-menu_operaciones.add_command(label="Dividir un PDF (Prefijo Personalizado)", command=mostrar_dividir_pdf_unico_prefijo)
-menu_operaciones.add_command(label="Convertir PDF a JPG", command=mostrar_pdf_a_jpg)
-menu_operaciones.add_command(label="Unir PDFs en un Solo PDF", command=mostrar_unir_pdfs)
-menu_operaciones.add_command(label="Unir JPGs en un PDF", command=mostrar_unir_jpgs)
-menubar.add_cascade(label="Operaciones", menu=menu_operaciones)
-
-menu_ayuda = tk.Menu(menubar, tearoff=0)
-menu_ayuda.add_command(label="Ayuda en Línea", command=ayuda_en_linea)
-menu_ayuda.add_command(label="Acerca de la aplicación", command=acerca_de)
-menubar.add_cascade(label="Ayuda", menu=menu_ayuda)
-
-root.config(menu=menubar)
-
-# Área principal para mostrar la interfaz (contenido dinámico)
-main_frame = ttk.Frame(root)
-main_frame.pack(expand=True, fill="both", padx=20, pady=20)
-
-# Mostrar pantalla de inicio
-mostrar_inicio()
-
-root.mainloop()
+    root.mainloop()
+    sys.exit(codigo_salida)
@@ -0,0 +1,177 @@
+"""
+Caché en disco (SQLite) de los nombres de alumno ya extraídos de cada página.
+
+Durante un trimestre los mismos boletines se dividen, renombran y agrupan
+muchas veces, y cada vez había que volver a buscar el nombre en cada página.
+La caché guarda, para cada página, el resultado de la extracción bajo una clave
+calculada con la huella SHA-256 de su flujo de contenido, el patrón de nombre
+y el tipo de consulta; una página igual en otro PDF, o el mismo PDF en otra
+carpeta, reutiliza el resultado sin maquetar el texto. También se guarda que
+una página no tiene nombre.
+
+Mientras está activa (configurar), las búsquedas se hacen en la base de datos,
+pero las entradas nuevas y las fechas de uso se acumulan en memoria y se
+escriben juntas con volcar(). Al volcar, si las entradas ocupan más del
+límite, se borran las usadas hace más tiempo hasta quedar por debajo.
+
+Cada proceso trabajador abre su propia conexión: _ejecutar_en_procesos le pasa
+la configuración del proceso principal al crear el pool. Un fallo de la caché
+nunca interrumpe la operación; solo desactiva la caché hasta la siguiente.
+sqlite3 se importa con la primera consulta, no al arrancar la aplicación.
+"""
+import os
+import time
+import hashlib
+
+RUTA_CACHE_POR_DEFECTO = os.path.join(os.path.expanduser("~"), ".blanchedalmond_cache.sqlite3")
+LIMITE_POR_DEFECTO_MB = 32
+
+# Entradas pendientes a partir de las que se vuelca sin esperar al final
+_PENDIENTES_MAXIMAS = 1000
+# Al superar el límite se borra hasta quedar en esta fracción, para no desalojar en cada volcado
+_FRACCION_TRAS_DESALOJO = 0.9
+# Bytes aproximados que ocupa cada fila además de la clave y el valor
+_SOBRECOSTE_FILA = 40
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS textos (
+    clave BLOB PRIMARY KEY,
+    valor TEXT,
+    tamano INTEGER NOT NULL,
+    uso REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS textos_uso ON textos (uso);
+"""
+
+_ruta = None
+_limite_mb = LIMITE_POR_DEFECTO_MB
+_conexion = None
+_nuevas = {}
+_usadas = set()
+
+def configurar(ruta, limite_mb=LIMITE_POR_DEFECTO_MB):
+    """Activa la caché en `ruta` (o la desactiva si es None) con el límite de tamaño indicado."""
+    global _ruta, _limite_mb
+    volcar()
+    _cerrar()
+    _ruta = ruta
+    _limite_mb = limite_mb
+
+def configuracion():
+    """(ruta, limite_mb) actuales, para activar la misma caché en los procesos trabajadores."""
+    return _ruta, _limite_mb
+
+def iniciar_trabajador(ruta, limite_mb):
+    """
+    Inicializador de los procesos del pool: activa la caché del proceso
+    principal sin tocar la conexión ni las entradas que se hayan heredado al
+    crear el proceso, que siguen siendo del principal.
+    """
+    global _ruta, _limite_mb, _conexion, _nuevas, _usadas
+    _conexion = None
+    _nuevas = {}
+    _usadas = set()
+    _ruta = ruta
+    _limite_mb = limite_mb
+
+def activa():
+    return _ruta is not None
+
+def clave(datos, patron, tipo):
+    """Clave de la caché para el flujo de contenido `datos` con ese patrón y tipo de consulta."""
+    huella = hashlib.sha256(datos)
+    huella.update(b"\0" + tipo.encode("utf-8") + b"\0" + patron.pattern.encode("utf-8"))
+    return huella.digest()
+
+def _cerrar():
+    global _conexion
+    if _conexion is not None:
+        _conexion.close()
+        _conexion = None
+
+def _desactivar(e):
+    global _ruta
+    print(f"Error en la caché de nombres {_ruta}, se desactiva: {e}")
+    _nuevas.clear()
+    _usadas.clear()
+    _cerrar()
+    _ruta = None
+
+def _abrir():
+    global _conexion
+    import sqlite3
+    if _conexion is None:
+        carpeta = os.path.dirname(_ruta)
+        if carpeta and not os.path.exists(carpeta):
+            os.makedirs(carpeta)
+        # Varios procesos pueden volcar a la vez: WAL y espera en lugar de fallar por el bloqueo.
+        # En la ventana cada operación corre en un hilo distinto, pero nunca dos a la vez.
+        _conexion = sqlite3.connect(_ruta, timeout=30, check_same_thread=False)
+        _conexion.execute("PRAGMA journal_mode=WAL")
+        _conexion.executescript(_ESQUEMA)
+    return _conexion
+
+def buscar(clave_pagina):
+    """
+    Devuelve (True, valor) si la clave está en la caché (valor puede ser None:
+    la página no tenía nombre) o (False, None) si no está o la caché está desactivada.
+    """
+    import sqlite3
+    if _ruta is None:
+        return False, None
+    if clave_pagina in _nuevas:
+        return True, _nuevas[clave_pagina]
+    try:
+        fila = _abrir().execute("SELECT valor FROM textos WHERE clave = ?", (clave_pagina,)).fetchone()
+    except sqlite3.Error as e:
+        _desactivar(e)
+        return False, None
+    if fila is None:
+        return False, None
+    _usadas.add(clave_pagina)
+    return True, fila[0]
+
+def guardar(clave_pagina, valor):
+    """Anota el resultado de una extracción; se escribe en disco con el siguiente volcar()."""
+    if _ruta is None:
+        return
+    _nuevas[clave_pagina] = valor
+    if len(_nuevas) >= _PENDIENTES_MAXIMAS:
+        volcar()
+
+def volcar():
+    """Escribe las entradas nuevas y las fechas de uso pendientes y desaloja si se supera el límite."""
+    import sqlite3
+    if _ruta is None or not (_nuevas or _usadas):
+        return
+    ahora = time.time()
+    try:
+        conexion = _abrir()
+        with conexion:
+            conexion.executemany("UPDATE textos SET uso = ? WHERE clave = ?",
+                                 [(ahora, clave_pagina) for clave_pagina in _usadas])
+            conexion.executemany(
+                "INSERT OR REPLACE INTO textos (clave, valor, tamano, uso) VALUES (?, ?, ?, ?)",
+                [(clave_pagina, valor, len(clave_pagina) + len((valor or "").encode("utf-8")) + _SOBRECOSTE_FILA,
+                  ahora) for clave_pagina, valor in _nuevas.items()])
+            _desalojar(conexion)
+    except sqlite3.Error as e:
+        _desactivar(e)
+        return
+    _nuevas.clear()
+    _usadas.clear()
+
+def _desalojar(conexion):
+    """Borra las entradas usadas hace más tiempo mientras la caché supere el límite."""
+    limite = _limite_mb * 1024 * 1024
+    total = conexion.execute("SELECT COALESCE(SUM(tamano), 0) FROM textos").fetchone()[0]
+    if total <= limite:
+        return
+    sobrante = total - int(limite * _FRACCION_TRAS_DESALOJO)
+    borrar = []
+    for clave_pagina, tamano in conexion.execute("SELECT clave, tamano FROM textos ORDER BY uso"):
+        borrar.append((clave_pagina,))
+        sobrante -= tamano
+        if sobrante <= 0:
+            break
+    conexion.executemany("DELETE FROM textos WHERE clave = ?", borrar)
@@ -0,0 +1,292 @@
+"""
+Interfaz de línea de órdenes de blanchedalmond.
+
+Usa las mismas funciones que la aplicación gráfica (módulo nucleo) sin importar
+tkinter ni ttkbootstrap, para poder lanzar los procesos desde cron o desde un
+servidor sin pantalla. Ejemplos:
+
+    python cli.py split-folder origen/ destino/ --procesos 8
+    python cli.py merge combinado.pdf a.pdf b.pdf c.pdf
+    python cli.py aggregate alumnos/ evaluacion1/ evaluacion2/ evaluacion3/
+    python cli.py watch
+"""
+import os
+import sys
+import json
+import argparse
+
+import nucleo
+import informe
+import vigilancia
+import cache_texto
+from indice import RUTA_INDICE_POR_DEFECTO, buscar
+from archivador import es_archivo_comprimido
+
+def mostrar_progreso(hechas, total):
+    """Muestra el progreso en una sola línea de la salida de error."""
+    sys.stderr.write(f"\r{hechas}/{total} páginas")
+    if hechas >= total:
+        sys.stderr.write("\n")
+    sys.stderr.flush()
+
+def informar_errores(errores):
+    """Escribe los errores en la salida de error y devuelve el código de salida."""
+    for error in errores:
+        print(error, file=sys.stderr)
+    return 1 if errores else 0
+
+def patron_de_args(args):
+    """Patrón de nombre compilado a partir de --etiquetas (separadas por comas)."""
+    return nucleo.compilar_patron([etiqueta.strip() for etiqueta in args.etiquetas.split(",") if etiqueta.strip()])
+
+def indice_de_args(args):
+    """Ruta del índice de nombres a actualizar, o None con --sin-indice."""
+    return None if args.sin_indice else args.indice
+
+def orden_split(args, progreso):
+    nombre_base = os.path.splitext(os.path.basename(args.archivo))[0]
+    # Un destino .zip/.tar recibe las páginas directamente, sin subcarpeta
+    carpeta_resultado = args.destino if es_archivo_comprimido(args.destino) else os.path.join(args.destino, nombre_base)
+    resultado = nucleo.dividir_pdf_archivo(args.archivo, carpeta_resultado, prefijo=args.prefijo,
+                                           nombrar_por_alumno=not args.sin_nombres, procesos=args.procesos,
+                                           progreso=progreso, patron=patron_de_args(args), indice=indice_de_args(args),
+                                           agrupar_paginas=args.agrupar_paginas)
+    print(f"{resultado['paginas']} páginas divididas en {carpeta_resultado}")
+    return informar_errores(resultado["errores"])
+
+def orden_split_folder(args, progreso):
+    if args.estimar:
+        estimacion = nucleo.estimar_division(args.origen, args.destino, prefijo=args.prefijo,
+                                             nombrar_por_alumno=not args.sin_nombres, procesos=args.procesos,
+                                             incremental=args.incremental, patron=patron_de_args(args),
+                                             agrupar_paginas=args.agrupar_paginas)
+        print(nucleo.resumen_estimacion(estimacion))
+        return informar_errores(estimacion["errores"])
+    # dividir_pdfs_carpeta ya escribe los errores de cada archivo
+    resultados = nucleo.dividir_pdfs_carpeta(args.origen, args.destino, prefijo=args.prefijo,
+                                             nombrar_por_alumno=not args.sin_nombres, procesos=args.procesos,
+                                             progreso=progreso, incremental=args.incremental,
+                                             patron=patron_de_args(args), indice=indice_de_args(args),
+                                             agrupar_paginas=args.agrupar_paginas)
+    paginas = sum(resultado["paginas"] for resultado in resultados)
+    omitidos = sum(1 for resultado in resultados if resultado.get("omitido"))
+    reanudados = sum(1 for resultado in resultados if resultado.get("reanudado"))
+    print(f"{len(resultados)} PDFs ({paginas} páginas) divididos en {args.destino}, "
+          f"{omitidos} sin cambios omitidos, {reanudados} reanudados")
+    return 1 if any(resultado["errores"] for resultado in resultados) else 0
+
+def carpetas_de_config(ruta="config.json"):
+    """carpeta_origen y carpeta_destino de config.json (la configuración de la aplicación gráfica)."""
+    try:
+        with open(ruta, "r", encoding="utf-8") as f:
+            config = json.load(f)
+    except (OSError, ValueError):
+        return "", ""
+    return config.get("carpeta_origen", ""), config.get("carpeta_destino", "")
+
+def orden_watch(args, progreso):
+    origen, destino = carpetas_de_config()
+    origen = args.origen or origen
+    destino = args.destino or destino
+    if not origen or not destino:
+        print("Indique las carpetas de origen y destino o guárdelas en config.json.", file=sys.stderr)
+        return 2
+    print(f"Vigilando {origen} (Ctrl+C para terminar)")
+    try:
+        vigilancia.vigilar_carpeta(origen, destino, intervalo=args.intervalo, espera=args.espera,
+                                   procesos=args.procesos, patron=patron_de_args(args), indice=indice_de_args(args),
+                                   agrupar_paginas=args.agrupar_paginas, progreso=progreso)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+def orden_rename(args, progreso):
+    # renombrar_pdfs ya escribe los errores de cada archivo
+    plan, errores = nucleo.renombrar_pdfs(args.carpeta, patron_de_args(args), indice=indice_de_args(args),
+                                          plan_csv=args.plan_csv)
+    renombrados = sum(1 for origen, destino, _ in plan if origen != destino)
+    print(f"{renombrados - len(errores)} PDFs renombrados en {args.carpeta}")
+    return 1 if errores else 0
+
+def orden_aggregate(args, progreso):
+    resultado = nucleo.agrupar_por_alumno(args.origenes, args.destino, patron=patron_de_args(args),
+                                          procesos=args.procesos, progreso=progreso, indice=indice_de_args(args),
+                                          agrupar_paginas=args.agrupar_paginas)
+    print(f"{len(resultado['alumnos'])} alumnos ({resultado['paginas']} páginas) en {args.destino}, "
+          f"{len(resultado['sin_nombre'])} páginas sin nombre")
+    return 1 if resultado["errores"] else 0
+
+def orden_search(args, progreso):
+    filas = buscar(args.indice, " ".join(args.texto), limite=args.limite)
+    for fila in filas:
+        pagina = "archivo" if fila["pagina"] == 0 else f"página {fila['pagina']}"
+        print(f"{fila['nombre']}\t{fila['origen']} ({pagina})\t{fila['salida'] or ''}\t{fila['fecha']}")
+    return 0 if filas else 1
+
+def leer_lista(ruta):
+    """Lee una lista de rutas, una por línea, ignorando las líneas vacías."""
+    with open(ruta, "r", encoding="utf-8") as f:
+        return [linea.strip() for linea in f if linea.strip()]
+
+def orden_merge(args, progreso):
+    archivos = args.archivos + (leer_lista(args.lista) if args.lista else [])
+    if not archivos:
+        print("Debe indicar al menos un PDF, una carpeta o --lista.", file=sys.stderr)
+        return 2
+    paginas = nucleo.unir_pdfs(archivos, args.destino, progreso=progreso, optimizar=not args.sin_optimizar)
+    print(f"{paginas} páginas unidas en {args.destino}")
+    return 0
+
+def orden_pdf2jpg(args, progreso):
+    paginas = nucleo.pdf_a_jpg(args.archivo, args.destino, progreso=progreso, dpi=args.dpi, calidad=args.calidad,
+                               gris=args.gris, primera=args.primera, ultima=args.ultima, procesos=args.procesos)
+    print(f"{paginas} páginas convertidas a JPG en {args.destino}")
+    return 0
+
+def orden_jpg2pdf(args, progreso):
+    imagenes = nucleo.unir_jpgs(args.archivos, args.destino, progreso=progreso)
+    print(f"{imagenes} imágenes unidas en {args.destino}")
+    return 0
+
+def crear_parser():
+    parser = argparse.ArgumentParser(prog="blanchedalmond",
+                                     description="Dividir, renombrar y unir PDFs y convertir entre PDF y JPG.")
+    parser.add_argument("--progreso", action="store_true", help="muestra el progreso por páginas")
+    parser.add_argument("--informe", metavar="JSON",
+                        help="guarda un informe con los tiempos por etapa y por archivo, páginas, bytes y fallos")
+    parser.add_argument("--perfil", metavar="PROF", help="guarda un perfil de cProfile del proceso principal")
+    parser.add_argument("--indice", default=RUTA_INDICE_POR_DEFECTO,
+                        help="índice SQLite de nombres de alumno (por defecto: %(default)s)")
+    parser.add_argument("--sin-indice", action="store_true",
+                        help="no registrar los nombres encontrados en el índice")
+    parser.add_argument("--cache-texto", default=cache_texto.RUTA_CACHE_POR_DEFECTO,
+                        help="caché SQLite de los nombres ya extraídos de cada página (por defecto: %(default)s)")
+    parser.add_argument("--cache-texto-mb", type=int, default=cache_texto.LIMITE_POR_DEFECTO_MB,
+                        help="tamaño máximo de la caché en MB; se desalojan las entradas menos usadas "
+                             "(por defecto: %(default)s)")
+    parser.add_argument("--sin-cache-texto", action="store_true",
+                        help="extraer siempre el texto de cada página, sin usar la caché")
+    ordenes = parser.add_subparsers(dest="orden", required=True)
+
+    def opcion_etiquetas(sub):
+        sub.add_argument("--etiquetas", default=",".join(nucleo.ETIQUETAS_NOMBRE),
+                         help="etiquetas que preceden al nombre del alumno, separadas por comas "
+                              "(por defecto: %(default)s)")
+
+    def opciones_division(sub, procesos_por_defecto):
+        sub.add_argument("--prefijo", default="pagina",
+                         help="prefijo de las páginas sin nombre de alumno (por defecto: pagina)")
+        sub.add_argument("--sin-nombres", action="store_true",
+                         help="no nombrar las páginas por alumno, usar siempre el prefijo")
+        sub.add_argument("--agrupar-paginas", action="store_true",
+                         help="guardar cada boletín de varias páginas en un archivo: las páginas sin nombre "
+                              "se añaden al boletín anterior")
+        sub.add_argument("--procesos", type=int, default=procesos_por_defecto,
+                         help="número de procesos en paralelo (por defecto: %(default)s)")
+        opcion_etiquetas(sub)
+
+    sub = ordenes.add_parser("split", help="divide un PDF en páginas individuales")
+    sub.add_argument("archivo", help="PDF de origen")
+    sub.add_argument("destino", help="carpeta donde se crea la subcarpeta con las páginas, "
+                                     "o archivo .zip/.tar/.tar.gz donde guardarlas")
+    opciones_division(sub, 1)
+    sub.set_defaults(funcion=orden_split)
+
+    sub = ordenes.add_parser("split-folder", help="divide todos los PDFs de una carpeta")
+    sub.add_argument("origen", help="carpeta con los PDFs de origen")
+    sub.add_argument("destino", help="carpeta de destino, o archivo .zip/.tar/.tar.gz con una carpeta por PDF")
+    opciones_division(sub, nucleo.procesos_por_defecto())
+    sub.add_argument("--incremental", action="store_true",
+                     help="omitir los PDFs que no han cambiado desde la última ejecución (manifiesto en destino; "
+                          "no se aplica con un destino .zip/.tar)")
+    sub.add_argument("--estimar", action="store_true",
+                     help="no dividir: contar las páginas, medir una muestra y estimar salidas, tamaño y duración")
+    sub.set_defaults(funcion=orden_split_folder)
+
+    sub = ordenes.add_parser("watch", help="vigila la carpeta de origen y divide los PDFs nuevos según llegan")
+    sub.add_argument("origen", nargs="?", help="carpeta vigilada (por defecto: carpeta_origen de config.json)")
+    sub.add_argument("destino", nargs="?", help="carpeta de destino (por defecto: carpeta_destino de config.json)")
+    sub.add_argument("--intervalo", type=float, default=vigilancia.INTERVALO_POR_DEFECTO,
+                     help="segundos entre dos recorridos de la carpeta (por defecto: %(default)s)")
+    sub.add_argument("--espera", type=float, default=vigilancia.ESPERA_POR_DEFECTO,
+                     help="segundos sin cambios para dar por terminado un PDF (por defecto: %(default)s)")
+    sub.add_argument("--procesos", type=int, default=nucleo.procesos_por_defecto(),
+                     help="máximo de procesos en paralelo (por defecto: %(default)s)")
+    sub.add_argument("--agrupar-paginas", action="store_true",
+                     help="guardar cada boletín de varias páginas en un archivo")
+    opcion_etiquetas(sub)
+    sub.set_defaults(funcion=orden_watch)
+
+    sub = ordenes.add_parser("rename", help="renombra los PDFs de una carpeta según el nombre del alumno")
+    sub.add_argument("carpeta", help="carpeta que se recorre recursivamente")
+    sub.add_argument("--plan-csv", metavar="CSV",
+                     help="guarda el plan de renombrado (origen, destino, nombre) antes de aplicarlo")
+    opcion_etiquetas(sub)
+    sub.set_defaults(funcion=orden_rename)
+
+    sub = ordenes.add_parser("aggregate", help="crea un PDF por alumno con sus páginas de todos los orígenes")
+    sub.add_argument("destino", help="carpeta donde se crea un PDF por alumno")
+    sub.add_argument("origenes", nargs="+", help="PDFs o carpetas de PDFs (p. ej. una por evaluación), en orden")
+    sub.add_argument("--procesos", type=int, default=nucleo.procesos_por_defecto(),
+                     help="número de procesos en paralelo para leer los nombres (por defecto: %(default)s)")
+    sub.add_argument("--agrupar-paginas", action="store_true",
+                     help="añadir las páginas sin nombre al alumno de la página anterior")
+    opcion_etiquetas(sub)
+    sub.set_defaults(funcion=orden_aggregate)
+
+    sub = ordenes.add_parser("search", aliases=["buscar"], help="busca un alumno en el índice de nombres")
+    sub.add_argument("texto", nargs="+", help="palabras del nombre (sin distinguir mayúsculas ni acentos)")
+    sub.add_argument("--limite", type=int, default=200, help="máximo de resultados (por defecto: %(default)s)")
+    sub.set_defaults(funcion=orden_search)
+
+    sub = ordenes.add_parser("merge", help="une varios PDFs en uno, escribiendo página a página")
+    sub.add_argument("destino", help="PDF combinado")
+    sub.add_argument("archivos", nargs="*", help="PDFs o carpetas de PDFs de origen, en orden")
+    sub.add_argument("--lista", help="archivo de texto con un PDF o carpeta por línea (se añaden al final)")
+    sub.add_argument("--sin-optimizar", action="store_true",
+                     help="no compartir los objetos repetidos entre orígenes ni comprimir los flujos")
+    sub.set_defaults(funcion=orden_merge)
+
+    sub = ordenes.add_parser("pdf2jpg", help="convierte cada página de un PDF en una imagen JPG")
+    sub.add_argument("archivo", help="PDF de origen")
+    sub.add_argument("destino", help="carpeta de destino, o archivo .zip/.tar/.tar.gz donde guardar los JPG")
+    sub.add_argument("--dpi", type=int, default=nucleo.DPI_POR_DEFECTO, help="resolución (por defecto: %(default)s)")
+    sub.add_argument("--calidad", type=int, default=nucleo.CALIDAD_POR_DEFECTO,
+                     help="calidad JPEG de 1 a 95 (por defecto: %(default)s)")
+    sub.add_argument("--gris", action="store_true", help="generar las imágenes en escala de grises")
+    sub.add_argument("--primera", type=int, help="primera página a convertir (desde 1)")
+    sub.add_argument("--ultima", type=int, help="última página a convertir (incluida)")
+    sub.add_argument("--procesos", type=int, default=nucleo.procesos_por_defecto(),
+                     help="número de procesos en paralelo (por defecto: %(default)s)")
+    sub.set_defaults(funcion=orden_pdf2jpg)
+
+    sub = ordenes.add_parser("jpg2pdf", help="une varias imágenes JPG en un PDF, sin recomprimirlas")
+    sub.add_argument("destino", help="PDF resultante")
+    sub.add_argument("archivos", nargs="+", help="imágenes o carpetas de imágenes de origen, en orden")
+    sub.set_defaults(funcion=orden_jpg2pdf)
+    return parser
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+    if getattr(args, "procesos", 1) < 1:
+        print("El número de procesos debe ser un entero mayor que cero.", file=sys.stderr)
+        return 2
+    progreso = mostrar_progreso if args.progreso else None
+    cache_texto.configurar(None if args.sin_cache_texto else args.cache_texto, args.cache_texto_mb)
+    if args.informe:
+        parametros = {clave: valor for clave, valor in vars(args).items() if clave not in ("funcion", "informe")}
+        informe.iniciar(args.orden, parametros)
+    try:
+        with informe.perfilar(args.perfil):
+            return args.funcion(args, progreso)
+    except Exception as e:
+        informe.fallo(None, e)
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        cache_texto.volcar()
+        if args.informe:
+            informe.terminar().guardar(args.informe)
+
+if __name__ == "__main__":
+    sys.exit(main())
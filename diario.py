@@ -0,0 +1,113 @@
+"""
+Diario de trabajo para reanudar divisiones de carpetas interrumpidas.
+
+Cada PDF de origen tiene su propio diario (un JSON por línea) dentro de
+CARPETA_DIARIO en la carpeta de destino: una cabecera con el tamaño, la fecha
+y las opciones del origen, una línea por página escrita y una línea final
+cuando el origen está completo. Como cada origen lo procesa un único proceso,
+no hace falta coordinar escrituras entre procesos. Igual que en el manifiesto,
+las salidas se anotan relativas a la carpeta de destino, así que el diario
+sigue valiendo si se reanuda desde otro directorio de trabajo.
+"""
+import os
+import json
+import shutil
+
+CARPETA_DIARIO = ".blanchedalmond_diario"
+SUFIJO_PARCIAL = ".parcial"
+
+def ruta_diario(carpeta_salida, archivo):
+    """Ruta del diario del origen `archivo` dentro de carpeta_salida."""
+    return os.path.join(carpeta_salida, CARPETA_DIARIO, archivo + ".jsonl")
+
+def borrar_diarios(carpeta_salida):
+    """Elimina todos los diarios de carpeta_salida (la división terminó entera)."""
+    shutil.rmtree(os.path.join(carpeta_salida, CARPETA_DIARIO), ignore_errors=True)
+
+def limpiar_parciales(carpeta):
+    """Borra los archivos a medio escribir que haya dejado una ejecución interrumpida."""
+    if os.path.isdir(carpeta):
+        for archivo in os.listdir(carpeta):
+            if archivo.endswith(SUFIJO_PARCIAL):
+                os.remove(os.path.join(carpeta, archivo))
+
+class DiarioOrigen:
+    """Páginas ya escritas de un origen y registro de las nuevas."""
+
+    def __init__(self, ruta, ruta_pdf, opciones):
+        # `ruta` es la de ruta_diario: la carpeta de destino es la que contiene CARPETA_DIARIO
+        self.carpeta_salida = os.path.dirname(os.path.dirname(ruta))
+        estado = os.stat(ruta_pdf)
+        self.cabecera = {"tamano": estado.st_size, "mtime": estado.st_mtime, "opciones": opciones}
+        self.paginas = {}
+        self.nombres = {}
+        self.completo = False
+        self.total_paginas = None
+        lineas = []
+        if os.path.exists(ruta):
+            with open(ruta, "r", encoding="utf-8") as f:
+                lineas = f.readlines()
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        if not (lineas and self._leer(lineas)):
+            # Diario inexistente o de otra versión del origen: se empieza de cero
+            self.paginas = {}
+            self.nombres = {}
+            self.completo = False
+            self.total_paginas = None
+        # Se reescribe compactado: sin líneas cortadas ni páginas cuyo archivo ya no existe
+        self._archivo = open(ruta, "w", encoding="utf-8")
+        self._escribir(self.cabecera)
+        for indice in sorted(self.paginas):
+            self._escribir({"pagina": indice, "salida": self._relativa(self.paginas[indice]),
+                            "nombre": self.nombres.get(indice)})
+        if self.completo:
+            self._escribir({"fin": True, "paginas": self.total_paginas})
+
+    def _leer(self, lineas):
+        """Carga las líneas de un diario existente; devuelve False si no corresponde al origen."""
+        try:
+            if json.loads(lineas[0]) != self.cabecera:
+                return False
+        except ValueError:
+            return False
+        falta_alguna = False
+        for linea in lineas[1:]:
+            try:
+                registro = json.loads(linea)
+            except ValueError:
+                # Última línea cortada por la interrupción
+                break
+            if registro.get("fin"):
+                self.completo = True
+                self.total_paginas = registro["paginas"]
+            elif os.path.exists(os.path.join(self.carpeta_salida, registro["salida"])):
+                self.paginas[registro["pagina"]] = os.path.join(self.carpeta_salida, registro["salida"])
+                self.nombres[registro["pagina"]] = registro.get("nombre")
+            else:
+                falta_alguna = True
+        if falta_alguna:
+            # Alguna salida se ha borrado después: hay que volver a escribirla
+            self.completo = False
+            self.total_paginas = None
+        return True
+
+    def _relativa(self, ruta_salida):
+        """Ruta de una salida relativa a la carpeta de destino, como se guarda en el diario."""
+        return os.path.relpath(ruta_salida, self.carpeta_salida or os.curdir)
+
+    def _escribir(self, registro):
+        self._archivo.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        self._archivo.flush()
+
+    def registrar_pagina(self, indice, ruta_salida, nombre=None):
+        self.paginas[indice] = ruta_salida
+        self.nombres[indice] = nombre
+        self._escribir({"pagina": indice, "salida": self._relativa(ruta_salida), "nombre": nombre})
+
+    def terminar(self, total_paginas):
+        self.completo = True
+        self.total_paginas = total_paginas
+        self._escribir({"fin": True, "paginas": total_paginas})
+
+    def cerrar(self):
+        self._archivo.close()
@@ -0,0 +1,90 @@
+"""
+Lectura y escritura de PDFs con las menos llamadas al sistema posibles.
+
+Con decenas de miles de salidas de unos 30 KB en una carpeta de red, lo que
+cuesta no es generar los PDFs sino abrir, escribir y cerrar cada archivo.
+
+- Lectura: abrir_pdf lee cada origen con una sola apertura y una sola
+  lectura, como PdfReader(ruta). Los orígenes grandes (TAMANO_MINIMO_MMAP o
+  más) se proyectan con mmap: no se copian enteros en memoria y solo se leen
+  del disco las partes que se usan. Con los pequeños no compensa, porque
+  PyPDF2 lee el flujo a trozos de pocos bytes y cada lectura de un mmap es más
+  lenta que de un BytesIO. cerrar_pdf libera la proyección en cuanto ya no
+  hace falta el lector, para que el origen se pueda renombrar o sustituir (en
+  Windows un archivo proyectado no se puede).
+
+- Escritura: escribir_atomico genera cada salida en un buffer en memoria que
+  se reutiliza entre archivos (uno por hilo) y la escribe con una sola llamada
+  sobre un temporal junto al destino, que después se mueve a su nombre
+  definitivo. Así nunca aparece un archivo a medio escribir con el nombre final.
+"""
+import io
+import os
+import mmap
+import threading
+
+from diario import SUFIJO_PARCIAL
+
+# A partir de este tamaño los orígenes se proyectan con mmap en lugar de leerse enteros
+TAMANO_MINIMO_MMAP = 32 * 1024 * 1024
+# Un buffer que ha crecido más que esto no se guarda para la siguiente salida
+TAMANO_MAXIMO_BUFFER = 64 * 1024 * 1024
+
+_local = threading.local()
+
+def abrir_pdf(ruta):
+    """PdfReader de `ruta`, leído de una vez o, si es grande, proyectado en memoria con mmap."""
+    from PyPDF2 import PdfReader
+    with open(ruta, "rb") as f:
+        if os.fstat(f.fileno()).st_size < TAMANO_MINIMO_MMAP:
+            return PdfReader(io.BytesIO(f.read()))
+        try:
+            proyeccion = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            # Sistemas de archivos que no admiten mmap
+            return PdfReader(io.BytesIO(f.read()))
+    try:
+        return PdfReader(proyeccion)
+    except BaseException:
+        proyeccion.close()
+        raise
+
+def cerrar_pdf(reader):
+    """Libera la proyección de un lector de abrir_pdf; después no se puede usar ninguna de sus páginas."""
+    if isinstance(reader.stream, mmap.mmap):
+        reader.stream.close()
+
+def _buffer():
+    """Buffer de escritura reutilizable del hilo actual, vacío."""
+    buffer = getattr(_local, "buffer", None)
+    if buffer is None:
+        buffer = _local.buffer = io.BytesIO()
+    # Sin truncar, para conservar la memoria ya reservada: el tamaño útil lo da tell()
+    buffer.seek(0)
+    return buffer
+
+def escribir_atomico(ruta_salida, escribir):
+    """
+    Llama a escribir(f) sobre un buffer en memoria y escribe el resultado de
+    una vez en un archivo temporal junto a ruta_salida, que solo al terminar se
+    mueve a su nombre definitivo. escribir debe escribir de forma secuencial,
+    sin volver atrás. Devuelve los bytes escritos.
+    """
+    buffer = _buffer()
+    escribir(buffer)
+    tamano = buffer.tell()
+    temporal = ruta_salida + SUFIJO_PARCIAL
+    with buffer.getbuffer() as vista:
+        try:
+            with open(temporal, "wb", buffering=0) as f:
+                escritos = 0
+                while escritos < tamano:
+                    escritos += f.write(vista[escritos:tamano])
+            os.replace(temporal, ruta_salida)
+        except BaseException:
+            if os.path.exists(temporal):
+                os.remove(temporal)
+            raise
+    if tamano > TAMANO_MAXIMO_BUFFER:
+        _local.buffer = None
+    return tamano
@@ -0,0 +1,312 @@
+"""
+Escritura incremental de PDFs.
+
+PdfWriter de PyPDF2 guarda todas las páginas (y todo lo que referencian) en
+memoria hasta el write() final. EscritorPDF, en cambio, escribe cada página y
+sus objetos en el archivo en cuanto se añade, y solo conserva en memoria las
+posiciones de los objetos para la tabla xref y las referencias de las páginas.
+Los objetos compartidos dentro de un mismo PDF de origen (fuentes, imágenes)
+se escriben una sola vez mientras ese origen está abierto.
+
+Con optimizar=True, además, los objetos idénticos de orígenes distintos (el
+logotipo y las fuentes que repite cada boletín) se escriben una sola vez: cada
+objeto se serializa después de sus hijos y se busca su huella SHA-256 entre las
+de los objetos ya escritos. Los flujos sin comprimir se comprimen con Flate.
+
+anadir_jpeg crea una página con una imagen JPEG copiando sus bytes tal cual
+como flujo DCTDecode: solo se leen las cabeceras para conocer las dimensiones.
+"""
+import io
+import zlib
+import shutil
+import struct
+import hashlib
+
+from PyPDF2.generic import (ArrayObject, DecodedStreamObject, DictionaryObject, EncodedStreamObject, IndirectObject,
+                            NameObject, NullObject, NumberObject, StreamObject, TextStringObject)
+
+# Buffer grande: el archivo se escribe con pocas llamadas al sistema
+TAMANO_BUFFER = 1024 * 1024
+
+# Marcadores SOF de los JPEG con codificación de Huffman (no aritmética ni diferencial)
+_MARCADORES_SOF = {0xC0, 0xC1, 0xC2}
+_ESPACIOS_COLOR = {1: "/DeviceGray", 3: "/DeviceRGB", 4: "/DeviceCMYK"}
+
+def leer_cabecera_jpeg(archivo):
+    """
+    Lee los segmentos de cabecera de un JPEG abierto en binario hasta el SOF y
+    devuelve (ancho, alto, componentes, adobe), o None si el archivo no es un
+    JPEG que un visor de PDF pueda mostrar tal cual (DCTDecode, 8 bits).
+    adobe indica un segmento APP14 de Adobe, que en CMYK implica valores invertidos.
+    """
+    if archivo.read(2) != b"\xff\xd8":
+        return None
+    adobe = False
+    while True:
+        marcador = archivo.read(2)
+        while marcador[:1] == b"\xff" and marcador[1:] == b"\xff":
+            # Bytes de relleno entre segmentos
+            marcador = b"\xff" + archivo.read(1)
+        if len(marcador) < 2 or marcador[0] != 0xFF:
+            return None
+        longitud = archivo.read(2)
+        if len(longitud) < 2:
+            return None
+        datos = archivo.read(struct.unpack(">H", longitud)[0] - 2)
+        if marcador[1] == 0xEE and datos.startswith(b"Adobe"):
+            adobe = True
+        elif marcador[1] in _MARCADORES_SOF:
+            precision, alto, ancho, componentes = struct.unpack(">BHHB", datos[:6])
+            if precision != 8 or componentes not in _ESPACIOS_COLOR or not ancho or not alto:
+                return None
+            return ancho, alto, componentes, adobe
+        elif 0xC3 <= marcador[1] <= 0xCF and marcador[1] not in (0xC4, 0xC8, 0xCC):
+            # Otros procesos JPEG (sin pérdida, aritmético...) que no admite DCTDecode
+            return None
+        elif marcador[1] == 0xDA:
+            return None
+
+class EscritorPDF:
+    """Escribe un PDF página a página sin acumularlas en memoria."""
+
+    def __init__(self, destino, optimizar=True):
+        # `destino` es una ruta o un archivo binario ya abierto (que no se cierra aquí)
+        self._propio = isinstance(destino, str)
+        self._archivo = open(destino, "wb", buffering=TAMANO_BUFFER) if self._propio else destino
+        self._inicio = 0 if self._propio else self._archivo.tell()
+        self._optimizar = optimizar
+        self._por_huella = {}
+        self._posiciones = [None]  # el objeto 0 es la cabeza de la lista libre
+        self._paginas = []
+        # Los objetos de la raíz del árbol de páginas y del catálogo se escriben al final
+        self._raiz_paginas = self._reservar()
+        self._catalogo = self._reservar()
+        self._archivo.write(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+        self._origen = None
+
+    def _reservar(self):
+        """Reserva un número de objeto que se escribirá más adelante."""
+        self._posiciones.append(None)
+        return IndirectObject(len(self._posiciones) - 1, 0, None)
+
+    def _escribir_objeto(self, referencia, objeto):
+        self._escribir_serializado(referencia, self._serializar(objeto))
+
+    def _escribir_serializado(self, referencia, datos):
+        self._posiciones[referencia.idnum] = self._archivo.tell() - self._inicio
+        self._archivo.write(f"{referencia.idnum} 0 obj\n".encode("ascii"))
+        self._archivo.write(datos)
+        self._archivo.write(b"\nendobj\n")
+
+    @staticmethod
+    def _serializar(objeto):
+        buffer = io.BytesIO()
+        objeto.write_to_stream(buffer, None)
+        return buffer.getvalue()
+
+    def empezar_origen(self, reader, paginas=None):
+        """
+        Prepara la copia de las páginas de `reader` (o solo de `paginas`, si se
+        indican). Las referencias entre objetos del origen se traducen a números
+        nuevos mientras el origen está abierto; terminar_origen libera esa tabla.
+        """
+        self._origen = {"reader": reader, "traducidos": {}, "en_curso": set()}
+        # Las páginas se numeran antes de copiar nada para que las referencias
+        # entre páginas (enlaces, anotaciones) no arrastren páginas completas
+        for pagina in (reader.pages if paginas is None else paginas):
+            if pagina.indirect_reference is not None:
+                self._origen["traducidos"][pagina.indirect_reference.idnum] = self._reservar()
+
+    def terminar_origen(self):
+        self._origen = None
+
+    def _traducir(self, objeto):
+        """Copia un objeto directo cambiando sus referencias por las del PDF de salida."""
+        if isinstance(objeto, IndirectObject):
+            return self._traducir_referencia(objeto)
+        if isinstance(objeto, StreamObject):
+            # Los datos se copian tal cual, todavía comprimidos si llevan /Filter
+            if "/Filter" in objeto:
+                copia = EncodedStreamObject()
+                copia._data = objeto._data
+            elif self._optimizar and len(objeto._data) > 0:
+                copia = EncodedStreamObject()
+                copia._data = zlib.compress(objeto._data)
+                copia[NameObject("/Filter")] = NameObject("/FlateDecode")
+            else:
+                copia = DecodedStreamObject()
+                copia._data = objeto._data
+            for clave, valor in objeto.items():
+                if clave != "/Length":
+                    copia[clave] = self._traducir(valor)
+            return copia
+        if isinstance(objeto, DictionaryObject):
+            copia = DictionaryObject()
+            for clave, valor in objeto.items():
+                copia[clave] = self._traducir(valor)
+            return copia
+        if isinstance(objeto, ArrayObject):
+            return ArrayObject(self._traducir(valor) for valor in objeto)
+        return objeto
+
+    def _traducir_referencia(self, referencia):
+        """
+        Devuelve la referencia de salida de un objeto indirecto del origen,
+        escribiéndolo (después de sus hijos) si todavía no se ha escrito.
+        """
+        traducidos = self._origen["traducidos"]
+        en_curso = self._origen["en_curso"]
+        if referencia.idnum in traducidos:
+            return traducidos[referencia.idnum]
+        if referencia.idnum in en_curso:
+            # Ciclo entre objetos: se reserva el número y se escribe al volver
+            traducidos[referencia.idnum] = self._reservar()
+            return traducidos[referencia.idnum]
+        destino = referencia.get_object()
+        if isinstance(destino, DictionaryObject) and destino.get("/Type") == "/Pages":
+            return self._raiz_paginas
+        if isinstance(destino, DictionaryObject) and destino.get("/Type") == "/Page":
+            # Página que no forma parte de las copiadas: no se copia
+            return NullObject()
+        en_curso.add(referencia.idnum)
+        datos = self._serializar(self._traducir(destino))
+        en_curso.discard(referencia.idnum)
+        if referencia.idnum in traducidos:
+            salida = traducidos[referencia.idnum]
+            self._escribir_serializado(salida, datos)
+            return salida
+        huella = None
+        if self._optimizar and not _es_anotacion(destino):
+            huella = hashlib.sha256(datos).digest()
+            if huella in self._por_huella:
+                traducidos[referencia.idnum] = self._por_huella[huella]
+                return traducidos[referencia.idnum]
+        salida = self._reservar()
+        self._escribir_serializado(salida, datos)
+        if huella is not None:
+            self._por_huella[huella] = salida
+        traducidos[referencia.idnum] = salida
+        return salida
+
+    def anadir_pagina(self, pagina):
+        """Escribe una página de PyPDF2 (del origen abierto) y todo lo que referencia."""
+        copia = DictionaryObject()
+        for clave, valor in pagina.items():
+            if clave != "/Parent":
+                copia[clave] = self._traducir(valor)
+        copia[NameObject("/Parent")] = self._raiz_paginas
+        if pagina.indirect_reference is not None:
+            referencia = self._origen["traducidos"][pagina.indirect_reference.idnum]
+        else:
+            referencia = self._reservar()
+        self._escribir_objeto(referencia, copia)
+        self._paginas.append(referencia)
+
+    def anadir_jpeg(self, origen):
+        """
+        Añade una página del tamaño de la imagen JPEG `origen` (una ruta o un
+        archivo binario), a 72 ppp, copiando los datos comprimidos sin
+        decodificarlos. Devuelve False, sin escribir nada, si el JPEG no se
+        puede incrustar directamente.
+        """
+        archivo = open(origen, "rb") if isinstance(origen, str) else origen
+        try:
+            cabecera = leer_cabecera_jpeg(archivo)
+            if cabecera is None:
+                return False
+            ancho, alto, componentes, adobe = cabecera
+            archivo.seek(0, io.SEEK_END)
+            longitud = archivo.tell()
+            archivo.seek(0)
+            imagen = DictionaryObject({
+                NameObject("/Type"): NameObject("/XObject"),
+                NameObject("/Subtype"): NameObject("/Image"),
+                NameObject("/Width"): NumberObject(ancho),
+                NameObject("/Height"): NumberObject(alto),
+                NameObject("/ColorSpace"): NameObject(_ESPACIOS_COLOR[componentes]),
+                NameObject("/BitsPerComponent"): NumberObject(8),
+                NameObject("/Filter"): NameObject("/DCTDecode"),
+                NameObject("/Length"): NumberObject(longitud),
+            })
+            if componentes == 4 and adobe:
+                imagen[NameObject("/Decode")] = ArrayObject([NumberObject(1), NumberObject(0)] * 4)
+            referencia_imagen = self._reservar()
+            self._posiciones[referencia_imagen.idnum] = self._archivo.tell() - self._inicio
+            self._archivo.write(f"{referencia_imagen.idnum} 0 obj\n".encode("ascii"))
+            imagen.write_to_stream(self._archivo, None)
+            self._archivo.write(b"\nstream\n")
+            shutil.copyfileobj(archivo, self._archivo, TAMANO_BUFFER)
+            self._archivo.write(b"\nendstream\nendobj\n")
+        finally:
+            if isinstance(origen, str):
+                archivo.close()
+
+        contenido = DecodedStreamObject()
+        contenido._data = f"q {ancho} 0 0 {alto} 0 0 cm /Im0 Do Q".encode("ascii")
+        referencia_contenido = self._reservar()
+        self._escribir_objeto(referencia_contenido, contenido)
+        pagina = DictionaryObject({
+            NameObject("/Type"): NameObject("/Page"),
+            NameObject("/Parent"): self._raiz_paginas,
+            NameObject("/MediaBox"): ArrayObject([NumberObject(0), NumberObject(0),
+                                                  NumberObject(ancho), NumberObject(alto)]),
+            NameObject("/Resources"): DictionaryObject({
+                NameObject("/XObject"): DictionaryObject({NameObject("/Im0"): referencia_imagen}),
+            }),
+            NameObject("/Contents"): referencia_contenido,
+        })
+        referencia = self._reservar()
+        self._escribir_objeto(referencia, pagina)
+        self._paginas.append(referencia)
+        return True
+
+    def cerrar(self):
+        """Escribe el árbol de páginas, el catálogo, la tabla xref y el trailer."""
+        raiz = DictionaryObject({
+            NameObject("/Type"): NameObject("/Pages"),
+            NameObject("/Kids"): ArrayObject(self._paginas),
+            NameObject("/Count"): NumberObject(len(self._paginas)),
+        })
+        self._escribir_objeto(self._raiz_paginas, raiz)
+        catalogo = DictionaryObject({
+            NameObject("/Type"): NameObject("/Catalog"),
+            NameObject("/Pages"): self._raiz_paginas,
+        })
+        self._escribir_objeto(self._catalogo, catalogo)
+        informacion = self._reservar()
+        self._escribir_objeto(informacion, DictionaryObject({
+            NameObject("/Producer"): TextStringObject("jocarsa | blanchedalmond"),
+        }))
+
+        inicio_xref = self._archivo.tell() - self._inicio
+        self._archivo.write(f"xref\n0 {len(self._posiciones)}\n".encode("ascii"))
+        self._archivo.write(b"0000000000 65535 f \n")
+        for posicion in self._posiciones[1:]:
+            if posicion is None:
+                # Número reservado que no llegó a escribirse
+                self._archivo.write(b"0000000000 00000 f \n")
+            else:
+                self._archivo.write(f"{posicion:010d} 00000 n \n".encode("ascii"))
+        trailer = DictionaryObject({
+            NameObject("/Size"): NumberObject(len(self._posiciones)),
+            NameObject("/Root"): self._catalogo,
+            NameObject("/Info"): informacion,
+        })
+        self._archivo.write(b"trailer\n")
+        trailer.write_to_stream(self._archivo, None)
+        self._archivo.write(f"\nstartxref\n{inicio_xref}\n%%EOF\n".encode("ascii"))
+        if self._propio:
+            self._archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        if tipo is None:
+            self.cerrar()
+        elif self._propio:
+            self._archivo.close()
+
+def _es_anotacion(objeto):
+    """Las anotaciones no se comparten entre páginas aunque sean idénticas."""
+    return isinstance(objeto, DictionaryObject) and "/Subtype" in objeto and "/Rect" in objeto
@@ -0,0 +1,126 @@
+"""
+Búsqueda rápida del nombre del alumno en el flujo de contenido de una página.
+
+En lugar de maquetar todo el texto de la página con extract_text(), se recorren
+los operadores de texto (Tj, TJ, ', ") del flujo de contenido ya descomprimido,
+reconstruyendo las líneas a partir de los saltos (T*, Td, Tm...), y se para en
+la primera línea que cumple el patrón. Solo funciona con fuentes de codificación
+simple (los boletines usan WinAnsi); si no encuentra nada, quien llama debe
+recurrir a extract_text().
+"""
+import re
+
+# Cadenas literales (con un nivel de paréntesis anidados), cadenas hexadecimales,
+# corchetes de arrays, nombres, números, inicio de diccionario y operadores
+_TOKEN = re.compile(rb"""
+    (?P<literal>\((?:[^()\\]|\\.|\((?:[^()\\]|\\.)*\))*\))
+  | (?P<hex><[0-9A-Fa-f\s]*>)
+  | (?P<dict><<|>>)
+  | (?P<array>[\[\]])
+  | (?P<nombre>/[^\s/\[\]()<>{}%]*)
+  | (?P<numero>[+-]?(?:\d+\.?\d*|\.\d+))
+  | (?P<operador>[A-Za-z'"*][A-Za-z0-9'"*]*)
+""", re.VERBOSE | re.DOTALL)
+
+_ESCAPES = {b"n": b"\n", b"r": b"\r", b"t": b"\t", b"b": b"\b", b"f": b"\f",
+            b"(": b"(", b")": b")", b"\\": b"\\"}
+_ESCAPE = re.compile(rb"\\([0-7]{1,3}|\r\n|[\s\S])")
+
+# Un desplazamiento en TJ mayor que este (en milésimas de em) se lee como espacio
+_HUECO_TJ = 250
+
+def _decodificar_literal(token):
+    def sustituir(coincidencia):
+        escape = coincidencia.group(1)
+        if escape[:1].isdigit():
+            return bytes([int(escape, 8) & 0xFF])
+        if escape in (b"\n", b"\r", b"\r\n"):
+            return b""
+        return _ESCAPES.get(escape, escape)
+    return _ESCAPE.sub(sustituir, token[1:-1]).decode("latin-1")
+
+def _decodificar_hex(token):
+    digitos = re.sub(rb"\s", b"", token[1:-1])
+    if len(digitos) % 2:
+        digitos += b"0"
+    return bytes.fromhex(digitos.decode("ascii")).decode("latin-1")
+
+def _texto(tipo, token):
+    return _decodificar_literal(token) if tipo == "literal" else _decodificar_hex(token)
+
+def buscar_en_contenido(datos, patron):
+    """
+    Recorre el flujo de contenido `datos` (bytes) y devuelve la primera
+    coincidencia de `patron` en una línea de texto, o None si no hay ninguna.
+    """
+    linea = []
+    operandos = []
+    array = None
+    ultima_y = None
+
+    def cerrar_linea():
+        coincidencia = patron.search("".join(linea))
+        linea.clear()
+        return coincidencia
+
+    for token in _TOKEN.finditer(datos):
+        tipo = token.lastgroup
+        valor = token.group()
+        if tipo == "array":
+            if valor == b"[":
+                array = []
+            else:
+                operandos.append(("array", array or []))
+                array = None
+            continue
+        if array is not None:
+            array.append((tipo, valor))
+            continue
+        if tipo != "operador":
+            operandos.append((tipo, valor))
+            continue
+
+        salto = False
+        if valor == b"BI":
+            # Imagen en línea: sus datos binarios no se pueden tokenizar así
+            break
+        elif valor == b"Tj" and operandos and operandos[-1][0] in ("literal", "hex"):
+            linea.append(_texto(*operandos[-1]))
+        elif valor == b"TJ" and operandos and operandos[-1][0] == "array":
+            for tipo_elemento, elemento in operandos[-1][1]:
+                if tipo_elemento in ("literal", "hex"):
+                    linea.append(_texto(tipo_elemento, elemento))
+                elif tipo_elemento == "numero" and float(elemento) < -_HUECO_TJ:
+                    linea.append(" ")
+        elif valor in (b"'", b'"') and operandos and operandos[-1][0] in ("literal", "hex"):
+            coincidencia = cerrar_linea()
+            if coincidencia:
+                return coincidencia
+            linea.append(_texto(*operandos[-1]))
+        elif valor == b"T*":
+            salto = True
+        elif valor in (b"Td", b"TD") and len(operandos) >= 2:
+            if float(operandos[-1][1]) != 0:
+                salto = True
+            elif linea:
+                linea.append(" ")
+        elif valor == b"Tm" and len(operandos) >= 6:
+            y = float(operandos[-1][1])
+            if ultima_y is not None and y != ultima_y:
+                salto = True
+            elif linea:
+                linea.append(" ")
+            ultima_y = y
+        operandos = []
+        if salto:
+            coincidencia = cerrar_linea()
+            if coincidencia:
+                return coincidencia
+    return cerrar_linea()
+
+def contenido_de_pagina(pagina):
+    """Flujo de contenido descomprimido de una página de PyPDF2 (bytes), o None si no tiene."""
+    contenido = pagina.get_contents()
+    if contenido is None:
+        return None
+    return contenido.get_data()
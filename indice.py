@@ -0,0 +1,109 @@
+"""
+Índice local (SQLite) de los nombres de alumno encontrados al dividir y renombrar.
+
+Cada página con nombre queda registrada con el PDF de origen, el número de
+página (0 si es el archivo entero, al renombrar), el archivo generado, la
+huella SHA-256 del origen y la fecha de la ejecución. Así se puede saber qué
+archivo es el boletín de un alumno sin volver a recorrer las carpetas.
+
+Las búsquedas no distinguen mayúsculas ni acentos: cada palabra normalizada
+del nombre se guarda en una tabla aparte con su propio índice, y cada palabra
+buscada debe ser el principio de alguna de ellas ("gar" encuentra "García").
+Así la consulta usa el índice en lugar de recorrer toda la tabla y responde en
+milisegundos aunque haya cientos de miles de páginas.
+"""
+import os
+import sqlite3
+import unicodedata
+from datetime import datetime
+
+from manifiesto import huella_archivo
+
+RUTA_INDICE_POR_DEFECTO = os.path.join(os.path.expanduser("~"), ".blanchedalmond_indice.sqlite3")
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS paginas (
+    id INTEGER PRIMARY KEY,
+    nombre TEXT NOT NULL,
+    nombre_normalizado TEXT NOT NULL,
+    origen TEXT NOT NULL,
+    pagina INTEGER NOT NULL,
+    salida TEXT,
+    sha256 TEXT,
+    fecha TEXT NOT NULL,
+    UNIQUE (origen, pagina)
+);
+CREATE TABLE IF NOT EXISTS palabras (
+    palabra TEXT NOT NULL,
+    pagina_id INTEGER NOT NULL REFERENCES paginas (id)
+);
+CREATE INDEX IF NOT EXISTS palabras_palabra ON palabras (palabra, pagina_id);
+CREATE INDEX IF NOT EXISTS palabras_pagina ON palabras (pagina_id);
+"""
+
+# Mayor que cualquier carácter de un nombre: cota superior de las búsquedas por prefijo
+_FINAL = "\U0010ffff"
+
+def normalizar(texto):
+    """Minúsculas, sin acentos y con los espacios simplificados."""
+    descompuesto = unicodedata.normalize("NFKD", texto)
+    sin_acentos = "".join(caracter for caracter in descompuesto if not unicodedata.combining(caracter))
+    return " ".join(sin_acentos.lower().split())
+
+def abrir_indice(ruta):
+    """Abre (y crea si hace falta) el índice en `ruta`."""
+    carpeta = os.path.dirname(ruta)
+    if carpeta and not os.path.exists(carpeta):
+        os.makedirs(carpeta)
+    conexion = sqlite3.connect(ruta)
+    conexion.executescript(_ESQUEMA)
+    return conexion
+
+def registrar_paginas(ruta_indice, origen, entradas):
+    """
+    Registra las páginas de un origen: entradas es una lista de
+    (número de página, nombre, archivo generado). Si el origen ya estaba
+    indexado, todas sus páginas anteriores se sustituyen por estas.
+    """
+    if not entradas:
+        return
+    origen = os.path.abspath(origen)
+    huella = huella_archivo(origen) if os.path.exists(origen) else None
+    fecha = datetime.now().isoformat(timespec="seconds")
+    conexion = abrir_indice(ruta_indice)
+    try:
+        with conexion:
+            conexion.execute("DELETE FROM palabras WHERE pagina_id IN (SELECT id FROM paginas WHERE origen = ?)",
+                             (origen,))
+            conexion.execute("DELETE FROM paginas WHERE origen = ?", (origen,))
+            for pagina, nombre, salida in entradas:
+                normalizado = normalizar(nombre)
+                cursor = conexion.execute(
+                    "INSERT OR REPLACE INTO paginas (nombre, nombre_normalizado, origen, pagina, salida, sha256, fecha)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (nombre, normalizado, origen, pagina, os.path.abspath(salida) if salida else None, huella, fecha))
+                conexion.executemany("INSERT INTO palabras (palabra, pagina_id) VALUES (?, ?)",
+                                     [(palabra, cursor.lastrowid) for palabra in set(normalizado.split())])
+    finally:
+        conexion.close()
+
+def buscar(ruta_indice, texto, limite=200):
+    """
+    Devuelve las páginas en cuyo nombre cada palabra de `texto` es el principio
+    de alguna palabra, las más recientes primero, como diccionarios.
+    """
+    palabras = normalizar(texto).split()
+    if not palabras or not os.path.exists(ruta_indice):
+        return []
+    condiciones = " AND ".join("id IN (SELECT pagina_id FROM palabras WHERE palabra >= ? AND palabra < ?)"
+                               for _ in palabras)
+    parametros = [valor for palabra in palabras for valor in (palabra, palabra + _FINAL)]
+    conexion = abrir_indice(ruta_indice)
+    conexion.row_factory = sqlite3.Row
+    try:
+        filas = conexion.execute(f"SELECT nombre, origen, pagina, salida, sha256, fecha FROM paginas "
+                                 f"WHERE {condiciones} ORDER BY fecha DESC, nombre, origen, pagina LIMIT ?",
+                                 parametros + [limite]).fetchall()
+    finally:
+        conexion.close()
+    return [dict(fila) for fila in filas]
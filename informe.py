@@ -0,0 +1,165 @@
+"""
+Informes de ejecución: dónde se va el tiempo de cada operación.
+
+Mientras hay un informe activo (iniciar ... terminar), el núcleo anota con
+medir() el tiempo de cada etapa (abrir, extraer, escribir, renombrar,
+rasterizar) por archivo de origen, las páginas y bytes escritos con contar() y
+los fallos con su motivo con fallo(). Sin informe activo estas llamadas no
+hacen nada, así que el coste en el camino caliente es despreciable.
+
+Los procesos trabajadores llevan su propio informe, que se devuelve junto con
+el resultado de cada tarea y se suma al del proceso principal (ver
+ejecutar_con_informe). perfilar() añade un volcado de cProfile del proceso
+principal; para perfilar todo el trabajo conviene usar un solo proceso.
+"""
+import os
+import json
+import time
+import platform
+from contextlib import contextmanager
+
+_actual = None
+
+class Informe:
+    """Tiempos por etapa y por archivo, páginas, bytes escritos y fallos de una ejecución."""
+
+    def __init__(self, operacion, parametros=None):
+        self.operacion = operacion
+        self.parametros = parametros or {}
+        self.inicio = time.strftime("%Y-%m-%d %H:%M:%S")
+        self._reloj = time.perf_counter()
+        self.segundos = None
+        self.etapas = {}
+        self.archivos = {}
+        self.fallos = []
+
+    def _archivo(self, archivo):
+        return self.archivos.setdefault(archivo, {"etapas": {}, "paginas": 0, "bytes_escritos": 0})
+
+    def anotar(self, etapa, segundos, archivo=None):
+        total = self.etapas.setdefault(etapa, {"segundos": 0.0, "veces": 0})
+        total["segundos"] += segundos
+        total["veces"] += 1
+        if archivo is not None:
+            etapas = self._archivo(archivo)["etapas"]
+            etapas[etapa] = etapas.get(etapa, 0.0) + segundos
+
+    def contar(self, archivo, paginas=0, bytes_escritos=0):
+        datos = self._archivo(archivo)
+        datos["paginas"] += paginas
+        datos["bytes_escritos"] += bytes_escritos
+
+    def fallo(self, archivo, motivo):
+        self.fallos.append({"archivo": archivo, "motivo": str(motivo)})
+
+    def combinar(self, otro):
+        """Suma el informe (como dict) de un proceso trabajador."""
+        for etapa, total in otro["etapas"].items():
+            propio = self.etapas.setdefault(etapa, {"segundos": 0.0, "veces": 0})
+            propio["segundos"] += total["segundos"]
+            propio["veces"] += total["veces"]
+        for datos in otro["archivos"]:
+            propio = self._archivo(datos["archivo"])
+            propio["paginas"] += datos["paginas"]
+            propio["bytes_escritos"] += datos["bytes_escritos"]
+            for etapa, segundos in datos["etapas"].items():
+                propio["etapas"][etapa] = propio["etapas"].get(etapa, 0.0) + segundos
+        self.fallos.extend(otro["fallos"])
+
+    def como_dict(self):
+        segundos = self.segundos if self.segundos is not None else time.perf_counter() - self._reloj
+        # Los archivos más lentos primero: son los que interesa mirar
+        archivos = sorted(self.archivos.items(), key=lambda item: -sum(item[1]["etapas"].values()))
+        return {
+            "operacion": self.operacion,
+            "parametros": self.parametros,
+            "inicio": self.inicio,
+            "segundos": round(segundos, 3),
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "paginas": sum(datos["paginas"] for datos in self.archivos.values()),
+            "bytes_escritos": sum(datos["bytes_escritos"] for datos in self.archivos.values()),
+            "etapas": {etapa: {"segundos": round(total["segundos"], 3), "veces": total["veces"]}
+                       for etapa, total in self.etapas.items()},
+            "archivos": [dict(datos, archivo=archivo, segundos=round(sum(datos["etapas"].values()), 3),
+                              etapas={etapa: round(s, 3) for etapa, s in datos["etapas"].items()})
+                         for archivo, datos in archivos],
+            "fallos": self.fallos,
+        }
+
+    def guardar(self, ruta):
+        carpeta = os.path.dirname(ruta)
+        if carpeta and not os.path.exists(carpeta):
+            os.makedirs(carpeta)
+        with open(ruta, "w", encoding="utf-8") as f:
+            json.dump(self.como_dict(), f, ensure_ascii=False, indent=4)
+
+def iniciar(operacion, parametros=None):
+    """Activa un informe nuevo para la operación que empieza y lo devuelve."""
+    global _actual
+    _actual = Informe(operacion, parametros)
+    return _actual
+
+def terminar():
+    """Desactiva el informe activo y lo devuelve con la duración total fijada."""
+    global _actual
+    informe, _actual = _actual, None
+    if informe is not None:
+        informe.segundos = time.perf_counter() - informe._reloj
+    return informe
+
+def activo():
+    return _actual is not None
+
+@contextmanager
+def medir(etapa, archivo=None):
+    """Suma al informe activo el tiempo que tarda el bloque en la etapa indicada."""
+    if _actual is None:
+        yield
+        return
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        if _actual is not None:
+            _actual.anotar(etapa, time.perf_counter() - inicio, archivo)
+
+def contar(archivo, paginas=0, bytes_escritos=0):
+    if _actual is not None:
+        _actual.contar(archivo, paginas, bytes_escritos)
+
+def fallo(archivo, motivo):
+    if _actual is not None:
+        _actual.fallo(archivo, motivo)
+
+def combinar(datos):
+    """Suma al informe activo el de un proceso trabajador (ver ejecutar_con_informe)."""
+    if _actual is not None:
+        _actual.combinar(datos)
+
+def ejecutar_con_informe(funcion, *argumentos):
+    """
+    Tarea de un proceso trabajador: ejecuta funcion con un informe propio y
+    devuelve (resultado, informe como dict) para combinarlo en el principal.
+    """
+    iniciar("trabajador")
+    try:
+        resultado = funcion(*argumentos)
+    finally:
+        datos = terminar().como_dict()
+    return resultado, datos
+
+@contextmanager
+def perfilar(ruta):
+    """Perfila el bloque con cProfile y guarda las estadísticas en `ruta` (si no es None)."""
+    if ruta is None:
+        yield
+        return
+    import cProfile
+    perfil = cProfile.Profile()
+    perfil.enable()
+    try:
+        yield
+    finally:
+        perfil.disable()
+        perfil.dump_stats(ruta)
@@ -0,0 +1,77 @@
+"""
+Manifiesto de la carpeta de destino para las re-ejecuciones incrementales.
+
+Por cada PDF de origen ya dividido guarda su huella (SHA-256), tamaño, fecha de
+modificación, número de páginas, salidas generadas y las opciones con las que
+se dividió. En la siguiente ejecución los orígenes que no han cambiado se
+omiten sin abrirlos.
+"""
+import os
+import json
+import hashlib
+
+ARCHIVO_MANIFIESTO = ".blanchedalmond_manifiesto.json"
+VERSION_MANIFIESTO = 1
+
+def huella_archivo(ruta, tamano_bloque=1024 * 1024):
+    """SHA-256 del contenido de un archivo, leído por bloques."""
+    sha = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        for bloque in iter(lambda: f.read(tamano_bloque), b""):
+            sha.update(bloque)
+    return sha.hexdigest()
+
+def cargar_manifiesto(carpeta_salida):
+    """Lee el manifiesto de carpeta_salida; si no existe o está dañado devuelve uno vacío."""
+    ruta = os.path.join(carpeta_salida, ARCHIVO_MANIFIESTO)
+    if os.path.exists(ruta):
+        try:
+            with open(ruta, "r", encoding="utf-8") as f:
+                manifiesto = json.load(f)
+            if manifiesto.get("version") == VERSION_MANIFIESTO:
+                return manifiesto
+        except Exception as e:
+            print("Error al cargar el manifiesto:", e)
+    return {"version": VERSION_MANIFIESTO, "origenes": {}}
+
+def guardar_manifiesto(carpeta_salida, manifiesto):
+    """Escribe el manifiesto de forma atómica (archivo temporal y os.replace)."""
+    ruta = os.path.join(carpeta_salida, ARCHIVO_MANIFIESTO)
+    temporal = ruta + ".tmp"
+    try:
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump(manifiesto, f, ensure_ascii=False, indent=4)
+        os.replace(temporal, ruta)
+    except Exception as e:
+        print("Error al guardar el manifiesto:", e)
+
+def origen_sin_cambios(manifiesto, archivo, ruta_pdf, carpeta_salida, opciones):
+    """
+    Indica si `archivo` ya se dividió con las mismas opciones y no ha cambiado.
+    Si tamaño y fecha coinciden no se lee el archivo; si solo cambia la fecha se
+    compara la huella (y se actualiza la fecha para la próxima vez). También
+    exige que todas las salidas registradas sigan existiendo.
+    """
+    entrada = manifiesto["origenes"].get(archivo)
+    if entrada is None or entrada.get("opciones") != opciones:
+        return False
+    estado = os.stat(ruta_pdf)
+    if estado.st_size != entrada["tamano"]:
+        return False
+    if estado.st_mtime != entrada["mtime"]:
+        if huella_archivo(ruta_pdf) != entrada["sha256"]:
+            return False
+        entrada["mtime"] = estado.st_mtime
+    return all(os.path.exists(os.path.join(carpeta_salida, salida)) for salida in entrada["salidas"])
+
+def registrar_origen(manifiesto, archivo, ruta_pdf, carpeta_salida, opciones, resultado):
+    """Anota en el manifiesto un origen que se acaba de dividir sin errores."""
+    estado = os.stat(ruta_pdf)
+    manifiesto["origenes"][archivo] = {
+        "sha256": huella_archivo(ruta_pdf),
+        "tamano": estado.st_size,
+        "mtime": estado.st_mtime,
+        "paginas": resultado["paginas"],
+        "salidas": [os.path.relpath(salida, carpeta_salida) for salida in resultado["salidas"]],
+        "opciones": opciones,
+    }
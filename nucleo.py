@@ -0,0 +1,1384 @@
+import os
+import re
+
+from manifiesto import cargar_manifiesto, guardar_manifiesto, origen_sin_cambios, registrar_origen
+from diario import DiarioOrigen, ruta_diario, borrar_diarios, limpiar_parciales, SUFIJO_PARCIAL
+from entrada_salida import abrir_pdf, cerrar_pdf, escribir_atomico
+from extraccion import buscar_en_contenido, contenido_de_pagina
+import informe
+import cache_texto
+
+# PyPDF2, pdf2image, PIL y el pool de procesos se importan dentro de las
+# funciones que los usan: así importar este módulo (al arrancar la ventana o la
+# línea de órdenes) es inmediato y cada dependencia solo se carga con la
+# primera operación que la necesita.
+
+def _importar_opcional(modulo, nombre):
+    """Importa nombre desde un módulo opcional o lanza RuntimeError si no está instalado."""
+    try:
+        return getattr(__import__(modulo, fromlist=[nombre]), nombre)
+    except ImportError:
+        raise RuntimeError(f"El módulo {modulo} no está instalado.")
+
+class OperacionCancelada(Exception):
+    """Se lanza cuando el usuario cancela una operación entre dos páginas."""
+
+# --- Funciones comunes ---
+ETIQUETAS_NOMBRE = ["Alumne/a", "Alumno/a"]
+
+def compilar_patron(etiquetas):
+    """Compila el patrón 'Etiqueta: nombre' para una lista de etiquetas (p. ej. ['Alumne/a'])."""
+    return re.compile(r'(?:' + '|'.join(re.escape(etiqueta) for etiqueta in etiquetas) + r'):\s*(.+)')
+
+PATRON_NOMBRE = compilar_patron(ETIQUETAS_NOMBRE)
+
+def extraer_nombres_pdf(ruta_archivo, patron=None, solo_primero=False):
+    """
+    Extrae nombres del PDF buscando líneas que contengan 'Alumne/a:' o 'Alumno/a:'
+    (o las etiquetas de `patron`). Con solo_primero=True se recorren las páginas en
+    orden con extraer_nombre_pagina y se para en el primer nombre encontrado.
+    """
+    patron = patron or PATRON_NOMBRE
+    nombres = []
+    reader = None
+    try:
+        with informe.medir("abrir", ruta_archivo):
+            reader = abrir_pdf(ruta_archivo)
+        for pagina in reader.pages:
+            if solo_primero:
+                with informe.medir("extraer", ruta_archivo):
+                    nombre = extraer_nombre_pagina(pagina, patron)
+                if nombre:
+                    return [nombre]
+                continue
+            with informe.medir("extraer", ruta_archivo):
+                nombres.extend(_nombres_de_pagina(pagina, patron))
+    except Exception as e:
+        print(f"Error al leer {ruta_archivo}: {e}")
+        informe.fallo(ruta_archivo, f"Error al leer: {e}")
+    finally:
+        if reader is not None:
+            cerrar_pdf(reader)
+    return nombres
+
+def _clave_cache(pagina, patron, tipo):
+    """(clave en cache_texto, flujo de contenido) de una página; la clave es None sin caché o sin contenido."""
+    try:
+        datos = contenido_de_pagina(pagina)
+    except Exception:
+        return None, None
+    if datos is None or not cache_texto.activa():
+        return None, datos
+    return cache_texto.clave(datos, patron, tipo), datos
+
+def _nombres_de_pagina(pagina, patron):
+    """Todas las coincidencias de patron en el texto completo de una página, pasando por la caché."""
+    clave, _ = _clave_cache(pagina, patron, "nombres")
+    if clave is not None:
+        encontrado, valor = cache_texto.buscar(clave)
+        if encontrado:
+            return valor.split("\n") if valor else []
+    texto = pagina.extract_text()
+    coincidencias = patron.findall(texto) if texto else []
+    if clave is not None:
+        cache_texto.guardar(clave, "\n".join(coincidencias))
+    return coincidencias
+
+def extraer_nombre_pagina(pagina, patron=None):
+    """
+    Devuelve el primer nombre de alumno de una página ya cargada, o None si no lo hay.
+    Primero busca la etiqueta directamente en el flujo de contenido (extraccion.py),
+    parando en la primera coincidencia; solo si ahí no aparece maqueta el texto
+    completo con extract_text().
+
+    Con la caché de nombres activa (cache_texto.py) el resultado se guarda bajo
+    la huella del flujo de contenido y una página ya vista no se vuelve a examinar.
+    """
+    patron = patron or PATRON_NOMBRE
+    clave, datos = _clave_cache(pagina, patron, "nombre")
+    if clave is not None:
+        encontrado, nombre = cache_texto.buscar(clave)
+        if encontrado:
+            return nombre
+    try:
+        coincidencia = buscar_en_contenido(datos, patron) if datos is not None else None
+    except Exception:
+        coincidencia = None
+    if coincidencia and coincidencia.group(1).strip():
+        nombre = coincidencia.group(1).strip()
+    else:
+        try:
+            texto = pagina.extract_text()
+        except Exception as e:
+            print(f"Error al extraer el texto de la página: {e}")
+            return None
+        coincidencia = patron.search(texto) if texto else None
+        nombre = coincidencia.group(1).strip() if coincidencia else None
+    if clave is not None:
+        cache_texto.guardar(clave, nombre)
+    return nombre
+
+def sanitizar_nombre(nombre):
+    """Sanitiza un string para usarlo como nombre de archivo válido."""
+    return re.sub(r'[\\/*?"<>|]', '_', nombre)
+
+def _nombres_ocupados(archivos):
+    """Nombres en minúsculas y sin extensión de los PDFs de la lista `archivos`, para _nombre_libre."""
+    return {os.path.splitext(archivo)[0].lower() for archivo in archivos if archivo.lower().endswith('.pdf')}
+
+def _nombre_libre(nombre, usados):
+    """Nombre de archivo para `nombre` que no coincide con ninguno de `usados` (y lo añade)."""
+    base = sanitizar_nombre(nombre)
+    candidato = base
+    repeticion = 1
+    while candidato.lower() in usados:
+        repeticion += 1
+        candidato = f"{base}_{repeticion}"
+    usados.add(candidato.lower())
+    return candidato + ".pdf"
+
+def _asignar_nombres(propuestos, usados):
+    """
+    Regla de nombres de dividir y renombrar: cada nombre propuesto, en orden,
+    recibe con _nombre_libre un nombre de PDF que no coincide (sin distinguir
+    mayúsculas) con `usados` ni con los asignados antes; el primero se queda el
+    nombre y los siguientes llevan _2, _3... Devuelve la lista de nombres.
+    """
+    return [_nombre_libre(propuesto, usados) for propuesto in propuestos]
+
+def _lleva_nombre(archivo, nombre):
+    """
+    Indica si el PDF `archivo` ya se llama como daría _asignar_nombres a `nombre`,
+    con o sin _2, _3...: así renombrar una carpeta ya dividida no cambia nada.
+    """
+    return re.fullmatch(re.escape(sanitizar_nombre(nombre)) + r"(_[0-9]+)?\.pdf", archivo) is not None
+
+def procesos_por_defecto():
+    """Número de procesos a usar cuando no se indica ninguno: uno por CPU."""
+    return os.cpu_count() or 1
+
+def contar_paginas(ruta_pdf):
+    """Número de páginas de un PDF (0 si no se puede abrir)."""
+    try:
+        reader = abrir_pdf(ruta_pdf)
+    except Exception:
+        return 0
+    try:
+        return len(reader.pages)
+    except Exception:
+        return 0
+    finally:
+        cerrar_pdf(reader)
+
+def comprobar_cancelacion(cancelar):
+    """Lanza OperacionCancelada si se ha pedido cancelar (cancelar es un Event o None)."""
+    if cancelar is not None and cancelar.is_set():
+        raise OperacionCancelada()
+
+# --- Ejecución en varios procesos ---
+def _ejecutar_en_procesos(funcion, tareas, procesos, aviso=None, cancelar=None, al_terminar=None):
+    """
+    Ejecuta funcion(*tarea, cola, evento) para cada tarea en un pool de procesos
+    y devuelve los resultados en el orden de las tareas.
+
+    Si se pide progreso o cancelación, los trabajadores reciben una cola en la que
+    anotan cada página terminada y un evento compartido que consultan entre
+    páginas; en caso contrario ambos son None. al_terminar(resultado), si se
+    indica, se llama en este proceso con el resultado de cada tarea en cuanto
+    termina, en el orden en que terminan. Los trabajadores usan la misma caché
+    de nombres que este proceso y la vuelcan al acabar cada tarea.
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+    gestor = None
+    cola = evento = None
+    if aviso is not None or cancelar is not None:
+        gestor = multiprocessing.Manager()
+        cola = gestor.Queue()
+        evento = gestor.Event()
+
+    def vaciar_cola():
+        while cola is not None and not cola.empty():
+            paginas = cola.get()
+            if aviso is not None:
+                aviso(paginas)
+
+    # Con un informe activo cada tarea devuelve también el informe de su proceso
+    con_informe = informe.activo()
+    try:
+        with ProcessPoolExecutor(max_workers=procesos, initializer=cache_texto.iniciar_trabajador,
+                                 initargs=cache_texto.configuracion()) as executor:
+            if con_informe:
+                futuros = [executor.submit(informe.ejecutar_con_informe, _tarea_trabajador, funcion, *tarea, cola,
+                                           evento) for tarea in tareas]
+            else:
+                futuros = [executor.submit(_tarea_trabajador, funcion, *tarea, cola, evento) for tarea in tareas]
+            pendientes = set(futuros)
+            while pendientes:
+                terminados, pendientes = wait(pendientes, timeout=0.2, return_when=FIRST_COMPLETED)
+                vaciar_cola()
+                if al_terminar is not None:
+                    for futuro in terminados:
+                        if not futuro.cancelled() and futuro.exception() is None:
+                            resultado = futuro.result()
+                            al_terminar(resultado[0] if con_informe else resultado)
+                if cancelar is not None and cancelar.is_set():
+                    evento.set()
+                    for futuro in pendientes:
+                        futuro.cancel()
+            vaciar_cola()
+            comprobar_cancelacion(cancelar)
+            resultados = [futuro.result() for futuro in futuros]
+            if con_informe:
+                for _, datos in resultados:
+                    informe.combinar(datos)
+                resultados = [resultado for resultado, _ in resultados]
+            return resultados
+    finally:
+        if gestor is not None:
+            gestor.shutdown()
+
+def _tarea_trabajador(funcion, *argumentos):
+    """Ejecuta una tarea en un proceso del pool y vuelca después su caché de nombres."""
+    try:
+        return funcion(*argumentos)
+    finally:
+        cache_texto.volcar()
+
+def _anadidor(archivador, entradas_de):
+    """
+    Función al_terminar(resultado) para _ejecutar_en_procesos que añade al
+    archivador las entradas (ruta, bytes) de cada resultado y las libera.
+    """
+    def anadir(resultado):
+        entradas = entradas_de(resultado)
+        for ruta_salida, datos in entradas:
+            archivador.anadir(ruta_salida, datos)
+        entradas.clear()
+    return anadir
+
+def _avisador(cola):
+    """Convierte la cola de un trabajador en una función aviso(paginas)."""
+    if cola is None:
+        return None
+    return cola.put
+
+# --- División de PDFs ---
+# Por debajo de este número de páginas por fragmento no compensa lanzar procesos
+PAGINAS_MINIMAS_POR_FRAGMENTO = 50
+
+def _escribir_paginas(archivo, reader, paginas):
+    """Escribe las `paginas` de reader en el archivo abierto, con sus flujos comprimidos."""
+    from escritor_pdf import EscritorPDF
+    with EscritorPDF(archivo) as escritor:
+        escritor.empezar_origen(reader, paginas)
+        for pagina in paginas:
+            escritor.anadir_pagina(pagina)
+        escritor.terminar_origen()
+
+# Motor de división: páginas → grupos (_fin_de_grupo) → nombre (_nombre_salida) → guardar(ruta, escribir)
+
+def _nombre_salida(prefijo, nombrar_por_alumno, primera, nombre):
+    """
+    Nombre propuesto, sin extensión, para la salida que empieza en la página
+    `primera` (desde 0); el definitivo lo da _asignar_nombres.
+    """
+    if nombrar_por_alumno and nombre:
+        return nombre
+    return f"{prefijo}_{primera+1}"
+
+def _fin_de_grupo(primera, total_paginas, nombre_de, agrupar_paginas, cancelar=None):
+    """
+    Página siguiente a la última de la salida que empieza en `primera`: ella
+    sola o, con agrupar_paginas, ella y las siguientes sin nombre de alumno.
+    """
+    fin = primera + 1
+    if agrupar_paginas:
+        while fin < total_paginas and not nombre_de(fin):
+            comprobar_cancelacion(cancelar)
+            fin += 1
+    return fin
+
+def _dividir_rango(reader, carpeta_salida, prefijo, nombrar_por_alumno, inicio, fin, aviso=None, cancelar=None,
+                   diario=None, patron=None, origen=None, guardar=escribir_atomico, agrupar_paginas=False,
+                   usados=None, provisionales=None):
+    """
+    Escribe las salidas que empiezan en las páginas [inicio, fin) de un reader
+    ya abierto y devuelve (salidas, errores, nombres); ver "Cómo se divide un PDF"
+    en el README.
+    """
+    salidas = []
+    errores = []
+    nombres = []
+    if usados is None:
+        usados = set()
+    total_paginas = len(reader.pages)
+    extraidos = {}
+
+    def nombre_de(i):
+        # Cada página se examina una sola vez aunque la pidan dos grupos
+        if i not in extraidos:
+            with informe.medir("extraer", origen):
+                extraidos[i] = extraer_nombre_pagina(reader.pages[i], patron)
+        return extraidos[i]
+
+    buscar_nombres = nombrar_por_alumno or agrupar_paginas
+    i = inicio
+    if agrupar_paginas and inicio > 0:
+        while i < fin and not nombre_de(i):
+            comprobar_cancelacion(cancelar)
+            i += 1
+    while i < fin:
+        comprobar_cancelacion(cancelar)
+        if diario is not None and i in diario.paginas:
+            ruta_salida = diario.paginas[i]
+            salidas.append(ruta_salida)
+            if diario.nombres.get(i):
+                nombres.append((i + 1, diario.nombres[i], ruta_salida))
+            siguiente = i + 1
+            while siguiente < total_paginas and diario.paginas.get(siguiente) == ruta_salida:
+                siguiente += 1
+            if aviso is not None:
+                aviso(siguiente - i)
+            i = siguiente
+            continue
+        nombre = nombre_de(i) if buscar_nombres else None
+        siguiente = _fin_de_grupo(i, total_paginas, nombre_de, agrupar_paginas, cancelar)
+        propuesto = _nombre_salida(prefijo, nombrar_por_alumno, i, nombre)
+        if provisionales is None:
+            ruta_salida = os.path.join(carpeta_salida, _asignar_nombres([propuesto], usados)[0])
+        else:
+            ruta_salida = os.path.join(carpeta_salida, f"{sanitizar_nombre(propuesto)}.{i + 1}{SUFIJO_PARCIAL}")
+        paginas = [reader.pages[j] for j in range(i, siguiente)]
+        try:
+            with informe.medir("escribir", origen):
+                tamano = guardar(ruta_salida, lambda f: _escribir_paginas(f, reader, paginas))
+            if provisionales is not None:
+                provisionales.append((ruta_salida, propuesto))
+            salidas.append(ruta_salida)
+            if nombre:
+                nombres.append((i + 1, nombre, ruta_salida))
+            if diario is not None:
+                for j in range(i, siguiente):
+                    diario.registrar_pagina(j, ruta_salida, nombre if j == i else None)
+            informe.contar(origen, paginas=len(paginas), bytes_escritos=tamano)
+        except Exception as e:
+            errores.append(f"Error al guardar {ruta_salida}: {e}")
+            informe.fallo(origen, errores[-1])
+        if aviso is not None:
+            aviso(len(paginas))
+        for j in range(i, siguiente):
+            extraidos.pop(j, None)
+        i = siguiente
+    return salidas, errores, nombres
+
+def _dividir_fragmento(archivo_entrada, carpeta_salida, prefijo, nombrar_por_alumno, inicio, fin, patron,
+                       agrupar_paginas=False, recoger=False, cola=None, evento=None):
+    """
+    Tarea de un proceso trabajador: abre su propio reader y escribe un rango de
+    páginas con nombres provisionales. Devuelve (inicio, salidas, errores,
+    nombres, provisionales, entradas); con recoger=True no escribe nada en
+    disco y entradas es la lista de (ruta, bytes) para el archivo ZIP/TAR del
+    proceso principal, si no es None.
+    """
+    from archivador import EntradasEnMemoria
+    with informe.medir("abrir", archivo_entrada):
+        reader = abrir_pdf(archivo_entrada)
+    entradas = EntradasEnMemoria() if recoger else None
+    provisionales = []
+    try:
+        partes = _dividir_rango(reader, carpeta_salida, prefijo, nombrar_por_alumno, inicio, fin, _avisador(cola),
+                                evento, patron=patron, origen=archivo_entrada, agrupar_paginas=agrupar_paginas,
+                                guardar=escribir_atomico if entradas is None else entradas.guardar,
+                                provisionales=provisionales)
+    except BaseException:
+        if entradas is None:
+            _borrar_provisionales(provisionales)
+        raise
+    finally:
+        cerrar_pdf(reader)
+    return (inicio,) + partes + (provisionales, None if entradas is None else entradas.entradas)
+
+def _borrar_provisionales(provisionales):
+    """Borra las salidas con nombre provisional de un fragmento que no se va a completar."""
+    for provisional, _ in provisionales:
+        if os.path.exists(provisional):
+            os.remove(provisional)
+
+def _resolver_provisionales(parte, carpeta_salida, usados, archivador=None):
+    """
+    Da su nombre definitivo a las salidas de un fragmento de _dividir_fragmento,
+    con _asignar_nombres y en orden de páginas como en una división secuencial:
+    mueve cada archivo provisional (o añade sus bytes al archivador) y cambia
+    las rutas de salidas y nombres de la parte.
+    """
+    _, salidas, _, nombres, provisionales, entradas = parte
+    datos = dict(entradas or [])
+    definitivas = {}
+    finales = _asignar_nombres([propuesto for _, propuesto in provisionales], usados)
+    for (provisional, _), final in zip(provisionales, finales):
+        definitiva = os.path.join(carpeta_salida, final)
+        if archivador is not None:
+            archivador.anadir(definitiva, datos.pop(provisional))
+        else:
+            os.replace(provisional, definitiva)
+        definitivas[provisional] = definitiva
+    salidas[:] = [definitivas.get(ruta, ruta) for ruta in salidas]
+    nombres[:] = [(pagina, nombre, definitivas.get(ruta, ruta)) for pagina, nombre, ruta in nombres]
+    provisionales.clear()
+    if entradas is not None:
+        entradas.clear()
+
+def _en_orden(claves, clave_de, procesar, pendientes):
+    """
+    Función al_terminar(resultado) para _ejecutar_en_procesos que llama a
+    procesar(resultado) en el orden de `claves` y no en el que terminan las
+    tareas: cada resultado espera en `pendientes` (clave -> resultado) hasta
+    que se han procesado todos los anteriores.
+    """
+    siguiente = [0]
+
+    def al_terminar(resultado):
+        pendientes[clave_de(resultado)] = resultado
+        while siguiente[0] < len(claves) and claves[siguiente[0]] in pendientes:
+            procesar(pendientes.pop(claves[siguiente[0]]))
+            siguiente[0] += 1
+    return al_terminar
+
+def calcular_fragmentos(total_paginas, procesos, minimo=PAGINAS_MINIMAS_POR_FRAGMENTO):
+    """Reparte total_paginas en rangos contiguos (inicio, fin), como mucho uno por proceso."""
+    tamano = max(minimo, -(-total_paginas // max(1, procesos)))
+    return [(inicio, min(inicio + tamano, total_paginas)) for inicio in range(0, total_paginas, tamano)]
+
+def dividir_pdf_archivo(archivo_entrada, carpeta_salida, prefijo="pagina", nombrar_por_alumno=False, procesos=1,
+                        progreso=None, cancelar=None, diario=None, patron=None, indice=None, agrupar_paginas=False,
+                        archivador=None):
+    """
+    Divide un PDF en una salida por página (o por boletín, con agrupar_paginas),
+    nombrada por alumno o con el prefijo, en una carpeta o un ZIP/TAR. Devuelve
+    un dict con paginas, salidas, errores y nombres; ver "Cómo se divide un PDF"
+    en el README.
+    """
+    from archivador import Archivador, es_archivo_comprimido
+    if archivador is None and es_archivo_comprimido(carpeta_salida):
+        with Archivador(carpeta_salida) as archivador:
+            return dividir_pdf_archivo(archivo_entrada, carpeta_salida, prefijo, nombrar_por_alumno, procesos,
+                                       progreso, cancelar, diario, patron, indice, agrupar_paginas, archivador)
+    if archivador is None and not os.path.exists(carpeta_salida):
+        os.makedirs(carpeta_salida)
+    if diario is not None and diario.completo:
+        salidas = list(dict.fromkeys(diario.paginas[i] for i in sorted(diario.paginas)))
+        nombres = [(i + 1, diario.nombres[i], diario.paginas[i])
+                   for i in sorted(diario.paginas) if diario.nombres.get(i)]
+        if progreso is not None:
+            progreso(diario.total_paginas, diario.total_paginas)
+        return {"paginas": diario.total_paginas, "salidas": salidas, "errores": [], "nombres": nombres}
+    with informe.medir("abrir", archivo_entrada):
+        reader = abrir_pdf(archivo_entrada)
+        total_paginas = len(reader.pages)
+    resultado = {"paginas": total_paginas, "salidas": [], "errores": [], "nombres": []}
+    # Solo se reservan los nombres de esta ejecución: repetirla sobrescribe las salidas de la anterior
+    usados = set()
+    if diario is not None:
+        # Las salidas ya escritas de una ejecución interrumpida conservan su nombre
+        usados.update(os.path.splitext(os.path.basename(ruta))[0].lower() for ruta in diario.paginas.values())
+    aviso = None
+    if progreso is not None:
+        hechas = [0]
+        def aviso(paginas):
+            hechas[0] += paginas
+            progreso(hechas[0], total_paginas)
+    fragmentos = calcular_fragmentos(total_paginas, 1 if diario is not None else procesos)
+    if len(fragmentos) <= 1:
+        try:
+            partes = [_dividir_rango(reader, carpeta_salida, prefijo, nombrar_por_alumno, 0, total_paginas,
+                                     aviso, cancelar, diario, patron, archivo_entrada,
+                                     escribir_atomico if archivador is None else archivador.guardar, agrupar_paginas,
+                                     usados)]
+        finally:
+            cerrar_pdf(reader)
+        if diario is not None:
+            diario.terminar(total_paginas)
+    else:
+        # Cada fragmento abre su propio lector
+        cerrar_pdf(reader)
+        del reader
+        # Los fragmentos escriben con nombres provisionales; los definitivos se eligen aquí en orden de páginas
+        recoger = archivador is not None
+        tareas = [(archivo_entrada, carpeta_salida, prefijo, nombrar_por_alumno, inicio, fin, patron,
+                   agrupar_paginas, recoger) for inicio, fin in fragmentos]
+        pendientes = {}
+        al_terminar = _en_orden([inicio for inicio, _ in fragmentos], lambda parte: parte[0],
+                                lambda parte: _resolver_provisionales(parte, carpeta_salida, usados, archivador),
+                                pendientes)
+        try:
+            partes = _ejecutar_en_procesos(_dividir_fragmento, tareas, len(fragmentos), aviso, cancelar,
+                                           al_terminar)
+        except BaseException:
+            if archivador is None:
+                for parte in pendientes.values():
+                    _borrar_provisionales(parte[4])
+            raise
+        partes = [parte[1:4] for parte in partes]
+    for salidas, errores, nombres in partes:
+        resultado["salidas"].extend(salidas)
+        resultado["errores"].extend(errores)
+        resultado["nombres"].extend(nombres)
+    if indice is not None:
+        _indexar(indice, archivo_entrada, resultado["nombres"])
+    return resultado
+
+def _indexar(indice, origen, nombres):
+    """Registra los nombres en el índice; un fallo del índice no estropea la división."""
+    from indice import registrar_paginas
+    try:
+        registrar_paginas(indice, origen, nombres)
+    except Exception as e:
+        print(f"Error al actualizar el índice de nombres: {e}")
+
+def _dividir_origen(ruta_pdf, carpeta_pdf, prefijo, nombrar_por_alumno, patron, agrupar_paginas, ruta_del_diario,
+                    aviso=None, cancelar=None, archivador=None):
+    """
+    Divide un PDF de origen recogiendo cualquier error salvo la cancelación.
+    Lleva un diario en ruta_del_diario (si no es None) para poder reanudarlo si
+    se interrumpe. Con `archivador` las páginas se guardan en él.
+    """
+    progreso = None
+    if aviso is not None:
+        # dividir_pdf_archivo da el total acumulado del origen; aviso espera las páginas nuevas
+        anteriores = [0]
+        def progreso(hechas, total):
+            aviso(hechas - anteriores[0])
+            anteriores[0] = hechas
+    diario = None
+    try:
+        reanudado = False
+        if ruta_del_diario is not None:
+            limpiar_parciales(carpeta_pdf)
+            diario = DiarioOrigen(ruta_del_diario, ruta_pdf,
+                                  _opciones_division(prefijo, nombrar_por_alumno, patron, agrupar_paginas))
+            reanudado = bool(diario.paginas) and not diario.completo
+        resultado = dividir_pdf_archivo(ruta_pdf, carpeta_pdf, prefijo, nombrar_por_alumno, progreso=progreso,
+                                        cancelar=cancelar, diario=diario, patron=patron,
+                                        agrupar_paginas=agrupar_paginas, archivador=archivador)
+        resultado["reanudado"] = reanudado
+    except OperacionCancelada:
+        raise
+    except Exception as e:
+        resultado = {"paginas": 0, "salidas": [], "errores": [f"Error al abrir {os.path.basename(ruta_pdf)}: {e}"],
+                     "nombres": []}
+        informe.fallo(ruta_pdf, resultado["errores"][0])
+    finally:
+        if diario is not None:
+            diario.cerrar()
+    resultado["archivo"] = os.path.basename(ruta_pdf)
+    return resultado
+
+def _dividir_origen_en_proceso(ruta_pdf, carpeta_pdf, prefijo, nombrar_por_alumno, patron, agrupar_paginas,
+                               ruta_del_diario, recoger=False, cola=None, evento=None):
+    """
+    Tarea de un proceso trabajador para dividir_pdfs_carpeta. Con recoger=True
+    las páginas no se escriben en disco: vuelven en "entradas" como (ruta, bytes).
+    """
+    from archivador import EntradasEnMemoria
+    if not recoger:
+        return _dividir_origen(ruta_pdf, carpeta_pdf, prefijo, nombrar_por_alumno, patron, agrupar_paginas,
+                               ruta_del_diario, _avisador(cola), evento)
+    entradas = EntradasEnMemoria()
+    resultado = _dividir_origen(ruta_pdf, carpeta_pdf, prefijo, nombrar_por_alumno, patron, agrupar_paginas,
+                                ruta_del_diario, _avisador(cola), evento, entradas)
+    resultado["entradas"] = entradas.entradas
+    return resultado
+
+def _opciones_division(prefijo, nombrar_por_alumno, patron, agrupar_paginas=False):
+    """Opciones que determinan los nombres de salida, para el manifiesto y el diario."""
+    opciones = {"prefijo": prefijo, "nombrar_por_alumno": nombrar_por_alumno,
+                "patron": (patron or PATRON_NOMBRE).pattern}
+    if agrupar_paginas:
+        # Solo se anota si está activo, para que los manifiestos anteriores sigan valiendo
+        opciones["agrupar_paginas"] = True
+    return opciones
+
+def dividir_pdfs_carpeta(carpeta_entrada, carpeta_salida, prefijo="pagina", nombrar_por_alumno=True, procesos=None,
+                         progreso=None, cancelar=None, incremental=False, patron=None, indice=None,
+                         agrupar_paginas=False, archivador=None, archivos=None):
+    """
+    Para cada PDF en carpeta_entrada (o solo los nombrados en `archivos`):
+      - Crea una subcarpeta (con el nombre del archivo sin extensión) en carpeta_salida.
+      - Divide el PDF en páginas individuales.
+    Cada página se nombra en la misma pasada con el primer nombre extraído de ella,
+    sin volver a abrir los archivos generados.
+
+    Los PDFs de origen son independientes, así que se reparten entre `procesos`
+    procesos (por defecto uno por CPU). Devuelve un resultado por archivo, en el
+    orden del listado de la carpeta (o de `archivos`). progreso, cancelar, patron y agrupar_paginas
+    funcionan como en dividir_pdf_archivo; el progreso es sobre el total de
+    páginas de la carpeta.
+
+    Cada origen lleva un diario en carpeta_salida (ver diario.py): si la ejecución
+    se interrumpe, la siguiente con las mismas opciones continúa en el origen y la
+    página donde se quedó. Los diarios se borran al terminar toda la carpeta.
+
+    Con incremental=True se usa el manifiesto de carpeta_salida (ver manifiesto.py)
+    para omitir los orígenes que no han cambiado desde la última ejecución; sus
+    resultados llevan "omitido": True.
+
+    Con `indice` los nombres de los orígenes divididos se registran en el índice
+    de alumnos (ver indice.py); lo hace este proceso, no los trabajadores.
+
+    Si carpeta_salida es un .zip, .tar, .tar.gz o .tgz (o se pasa un
+    `archivador` abierto) todas las páginas van a ese único archivo, con una
+    carpeta por origen, y no se escriben archivos sueltos. En ese caso no hay
+    diarios ni manifiesto: no se puede reanudar ni usar incremental.
+    """
+    from archivador import Archivador, es_archivo_comprimido
+    if archivador is None and es_archivo_comprimido(carpeta_salida):
+        with Archivador(carpeta_salida) as archivador:
+            return dividir_pdfs_carpeta(carpeta_entrada, carpeta_salida, prefijo, nombrar_por_alumno, procesos,
+                                        progreso, cancelar, incremental, patron, indice, agrupar_paginas,
+                                        archivador, archivos)
+    if archivador is None and not os.path.exists(carpeta_salida):
+        os.makedirs(carpeta_salida)
+    if archivos is None:
+        archivos_pdf = [f for f in os.listdir(carpeta_entrada) if f.lower().endswith('.pdf')]
+    else:
+        archivos_pdf = list(archivos)
+    opciones = _opciones_division(prefijo, nombrar_por_alumno, patron, agrupar_paginas)
+    manifiesto = cargar_manifiesto(carpeta_salida) if incremental and archivador is None else None
+    omitidos = {}
+    tareas = []
+    for archivo in archivos_pdf:
+        ruta_pdf = os.path.join(carpeta_entrada, archivo)
+        if manifiesto is not None and origen_sin_cambios(manifiesto, archivo, ruta_pdf, carpeta_salida, opciones):
+            entrada = manifiesto["origenes"][archivo]
+            omitidos[archivo] = {"archivo": archivo, "paginas": entrada["paginas"], "errores": [], "nombres": [],
+                                 "omitido": True,
+                                 "salidas": [os.path.join(carpeta_salida, salida) for salida in entrada["salidas"]]}
+            continue
+        nombre_pdf = os.path.splitext(archivo)[0]
+        carpeta_pdf = os.path.join(carpeta_salida, nombre_pdf)
+        tareas.append((ruta_pdf, carpeta_pdf, prefijo, nombrar_por_alumno, patron, agrupar_paginas,
+                       ruta_diario(carpeta_salida, archivo) if archivador is None else None))
+
+    aviso = None
+    if progreso is not None:
+        total_paginas = sum(contar_paginas(tarea[0]) for tarea in tareas)
+        hechas = [0]
+        def aviso(paginas):
+            hechas[0] += paginas
+            progreso(hechas[0], total_paginas)
+
+    if procesos is None:
+        procesos = procesos_por_defecto()
+    procesos = max(1, min(procesos, len(tareas)))
+    if procesos == 1:
+        procesados = [_dividir_origen(*tarea, aviso, cancelar, archivador) for tarea in tareas]
+    else:
+        # Con un archivador cada origen se añade en cuanto termina, para no tener todas las páginas en memoria
+        recoger = archivador is not None
+        procesados = _ejecutar_en_procesos(_dividir_origen_en_proceso, [tarea + (recoger,) for tarea in tareas],
+                                           procesos, aviso, cancelar,
+                                           _anadidor(archivador, lambda resultado: resultado.pop("entradas"))
+                                           if recoger else None)
+
+    for tarea, resultado in zip(tareas, procesados):
+        for error in resultado["errores"]:
+            print(error)
+        if indice is not None:
+            _indexar(indice, tarea[0], resultado["nombres"])
+    if archivador is None:
+        borrar_diarios(carpeta_salida)
+    if manifiesto is not None:
+        for tarea, resultado in zip(tareas, procesados):
+            if not resultado["errores"]:
+                registrar_origen(manifiesto, resultado["archivo"], tarea[0], carpeta_salida, opciones, resultado)
+        guardar_manifiesto(carpeta_salida, manifiesto)
+
+    por_archivo = {resultado["archivo"]: resultado for resultado in procesados}
+    por_archivo.update(omitidos)
+    return [por_archivo[archivo] for archivo in archivos_pdf]
+
+# --- Estimación de una división ---
+# Salidas de muestra que se generan en memoria para medir el coste por página
+MUESTRAS_ESTIMACION = 24
+# Se miden rachas de salidas seguidas: la primera de cada origen paga además las
+# fuentes y recursos compartidos, que el resto de sus páginas reutiliza
+SALIDAS_POR_RACHA = 4
+# Coste aproximado de arrancar el pool de procesos y el gestor de progreso
+SEGUNDOS_ARRANQUE_PROCESOS = 0.3
+
+def _posiciones_muestra(origenes, total_paginas, rachas):
+    """{índice del origen: [páginas]} con `rachas` páginas de inicio repartidas por igual entre todas las de la carpeta."""
+    posiciones = {}
+    if not total_paginas:
+        return posiciones
+    rachas = min(rachas, total_paginas)
+    objetivos = [(2 * k + 1) * total_paginas // (2 * rachas) for k in range(rachas)]
+    acumuladas = 0
+    for indice, (_, paginas, _) in enumerate(origenes):
+        for objetivo in objetivos:
+            if acumuladas <= objetivo < acumuladas + paginas:
+                posiciones.setdefault(indice, []).append(objetivo - acumuladas)
+        acumuladas += paginas
+    return posiciones
+
+def _medir_muestra(origenes, posiciones, nombrar_por_alumno, patron, agrupar_paginas, cancelar=None):
+    """
+    Genera en memoria, sin escribir nada, SALIDAS_POR_RACHA salidas seguidas a
+    partir de cada página de muestra, cada vez con un lector recién abierto como
+    haría el primer grupo de páginas de un origen. Devuelve un dict con las
+    páginas, segundos y bytes medidos, aparte los de la primera salida de cada
+    racha, y cuántas de las páginas examinadas tienen nombre.
+    """
+    import io
+    import time
+    medida = {"paginas": 0, "segundos": 0.0, "bytes": 0, "examinadas": 0, "con_nombre": 0,
+              "rachas": 0, "paginas_primera": 0, "segundos_primera": 0.0}
+    calentado = False
+    for indice, inicios in sorted(posiciones.items()):
+        ruta_pdf = origenes[indice][0]
+        for inicio_racha in inicios:
+            comprobar_cancelacion(cancelar)
+            try:
+                reader = abrir_pdf(ruta_pdf)
+            except Exception:
+                break
+            try:
+                total_paginas = len(reader.pages)
+                if not calentado:
+                    # La primera salida paga la carga de PyPDF2 y del escritor: no se cuenta
+                    _escribir_paginas(io.BytesIO(), reader, [reader.pages[inicio_racha]])
+                    calentado = True
+                    cerrar_pdf(reader)
+                    reader = abrir_pdf(ruta_pdf)
+                extraidos = {}
+
+                def nombre_de(i):
+                    if i not in extraidos:
+                        extraidos[i] = extraer_nombre_pagina(reader.pages[i], patron)
+                    return extraidos[i]
+                primera = inicio_racha
+                for salida_racha in range(SALIDAS_POR_RACHA):
+                    if primera >= total_paginas:
+                        break
+                    comprobar_cancelacion(cancelar)
+                    inicio = time.perf_counter()
+                    if nombrar_por_alumno or agrupar_paginas:
+                        nombre_de(primera)
+                    fin = _fin_de_grupo(primera, total_paginas, nombre_de, agrupar_paginas, cancelar)
+                    salida = io.BytesIO()
+                    _escribir_paginas(salida, reader, [reader.pages[i] for i in range(primera, fin)])
+                    segundos = time.perf_counter() - inicio
+                    if salida_racha == 0:
+                        medida["rachas"] += 1
+                        medida["paginas_primera"] += fin - primera
+                        medida["segundos_primera"] += segundos
+                    else:
+                        medida["paginas"] += fin - primera
+                        medida["segundos"] += segundos
+                    medida["bytes"] += salida.tell()
+                    primera = fin
+                medida["examinadas"] += len(extraidos)
+                medida["con_nombre"] += sum(1 for nombre in extraidos.values() if nombre)
+            finally:
+                cerrar_pdf(reader)
+    return medida
+
+def _cpus_disponibles():
+    """CPUs que puede usar este proceso (las de su afinidad si el sistema lo permite)."""
+    if hasattr(os, "sched_getaffinity"):
+        return max(1, len(os.sched_getaffinity(0)))
+    return os.cpu_count() or 1
+
+def estimar_division(carpeta_entrada, carpeta_salida=None, prefijo="pagina", nombrar_por_alumno=True, procesos=None,
+                     incremental=False, patron=None, agrupar_paginas=False, muestras=MUESTRAS_ESTIMACION,
+                     progreso=None, cancelar=None):
+    """
+    Ensayo de dividir_pdfs_carpeta con las mismas opciones, sin escribir nada.
+    Abre cada PDF solo para contar sus páginas (tabla de referencias y árbol de
+    páginas), genera en memoria unas `muestras` salidas, en rachas repartidas
+    por toda la carpeta, para medir el tiempo y el tamaño por página, y
+    extrapola. No cuenta más procesos en paralelo que CPUs disponibles.
+
+    Devuelve un dict con los orígenes a dividir y los omitidos (con incremental,
+    según el manifiesto de carpeta_salida), el total de páginas, las salidas y
+    bytes previstos, los segundos estimados con `procesos` procesos, el espacio
+    libre en el destino (None sin carpeta_salida) y los errores al abrir.
+    Con agrupar_paginas las salidas se estiman por la proporción de páginas con
+    nombre de la muestra. El tiempo no incluye la escritura en disco.
+    progreso(hechos, total) cuenta los PDFs abiertos.
+    """
+    import shutil
+    import time
+    from archivador import es_archivo_comprimido
+    archivos_pdf = [f for f in os.listdir(carpeta_entrada) if f.lower().endswith('.pdf')]
+    opciones = _opciones_division(prefijo, nombrar_por_alumno, patron, agrupar_paginas)
+    manifiesto = None
+    if incremental and carpeta_salida and not es_archivo_comprimido(carpeta_salida):
+        manifiesto = cargar_manifiesto(carpeta_salida)
+    resultado = {"origenes": 0, "omitidos": 0, "paginas": 0, "salidas": 0, "bytes": 0, "segundos": 0.0,
+                 "procesos": 1, "muestra": 0, "espacio_libre": None, "errores": []}
+
+    # Primera pasada: páginas y tiempo de apertura de cada origen
+    origenes = []
+    for hechos, archivo in enumerate(archivos_pdf, 1):
+        comprobar_cancelacion(cancelar)
+        ruta_pdf = os.path.join(carpeta_entrada, archivo)
+        if manifiesto is not None and origen_sin_cambios(manifiesto, archivo, ruta_pdf, carpeta_salida, opciones):
+            resultado["omitidos"] += 1
+        else:
+            inicio = time.perf_counter()
+            try:
+                reader = abrir_pdf(ruta_pdf)
+                try:
+                    paginas = len(reader.pages)
+                finally:
+                    cerrar_pdf(reader)
+                origenes.append((ruta_pdf, paginas, time.perf_counter() - inicio))
+            except Exception as e:
+                resultado["errores"].append(f"Error al abrir {archivo}: {e}")
+        if progreso is not None:
+            progreso(hechos, len(archivos_pdf))
+    total_paginas = sum(paginas for _, paginas, _ in origenes)
+    resultado["origenes"] = len(origenes)
+    resultado["paginas"] = total_paginas
+
+    # Segunda pasada: coste por página de una muestra y extrapolación
+    rachas = max(1, muestras // SALIDAS_POR_RACHA)
+    medida = _medir_muestra(origenes, _posiciones_muestra(origenes, total_paginas, rachas),
+                            nombrar_por_alumno, patron, agrupar_paginas, cancelar)
+    paginas_medidas = medida["paginas"] + medida["paginas_primera"]
+    resultado["muestra"] = paginas_medidas
+    if paginas_medidas:
+        if medida["paginas"]:
+            segundos_por_pagina = medida["segundos"] / medida["paginas"]
+        else:
+            segundos_por_pagina = medida["segundos_primera"] / medida["paginas_primera"]
+        # Lo que la primera salida de un origen tarda de más sobre el coste normal de sus páginas
+        extra_por_origen = max(0.0, (medida["segundos_primera"]
+                                     - medida["paginas_primera"] * segundos_por_pagina) / max(1, medida["rachas"]))
+        resultado["bytes"] = round(total_paginas * medida["bytes"] / paginas_medidas)
+        if agrupar_paginas and medida["examinadas"]:
+            resultado["salidas"] = max(len(origenes) if total_paginas else 0,
+                                       round(total_paginas * medida["con_nombre"] / medida["examinadas"]))
+        else:
+            resultado["salidas"] = total_paginas
+        # Cada origen lo divide un único proceso: el más largo marca el mínimo
+        duraciones = [abrir + extra_por_origen + paginas * segundos_por_pagina for _, paginas, abrir in origenes]
+        if procesos is None:
+            procesos = procesos_por_defecto()
+        resultado["procesos"] = max(1, min(procesos, len(origenes)))
+        # Más procesos que CPUs disponibles no dividen más rápido
+        paralelos = min(resultado["procesos"], _cpus_disponibles())
+        resultado["segundos"] = max(sum(duraciones) / paralelos, max(duraciones))
+        if resultado["procesos"] > 1:
+            resultado["segundos"] += SEGUNDOS_ARRANQUE_PROCESOS
+
+    if carpeta_salida:
+        carpeta = os.path.abspath(os.path.dirname(carpeta_salida) if es_archivo_comprimido(carpeta_salida)
+                                  else carpeta_salida)
+        while not os.path.exists(carpeta) and os.path.dirname(carpeta) != carpeta:
+            carpeta = os.path.dirname(carpeta)
+        try:
+            resultado["espacio_libre"] = shutil.disk_usage(carpeta).free
+        except OSError:
+            pass
+    return resultado
+
+def resumen_estimacion(estimacion):
+    """Texto de varias líneas con el resultado de estimar_division, para la ventana y la línea de órdenes."""
+    def tamano(numero):
+        for unidad in ("B", "KB", "MB", "GB"):
+            if numero < 1024 or unidad == "GB":
+                return f"{numero:.0f} {unidad}" if unidad == "B" else f"{numero:.1f} {unidad}"
+            numero /= 1024
+    segundos = int(round(estimacion["segundos"]))
+    lineas = [f"{estimacion['origenes']} PDFs con {estimacion['paginas']} páginas"
+              + (f" ({estimacion['omitidos']} sin cambios se omitirían)" if estimacion["omitidos"] else ""),
+              f"Salidas previstas: {estimacion['salidas']} archivos, unos {tamano(estimacion['bytes'])}",
+              f"Duración estimada con {estimacion['procesos']} "
+              f"{'proceso' if estimacion['procesos'] == 1 else 'procesos'}: "
+              f"{segundos // 3600}:{segundos % 3600 // 60:02d}:{segundos % 60:02d}"
+              f" (medida sobre {estimacion['muestra']} páginas)"]
+    if estimacion["espacio_libre"] is not None:
+        lineas.append(f"Espacio libre en el destino: {tamano(estimacion['espacio_libre'])}")
+        if estimacion["bytes"] > estimacion["espacio_libre"]:
+            lineas.append("Aviso: las salidas no caben en el espacio libre del destino.")
+    if estimacion["errores"]:
+        lineas.append(f"{len(estimacion['errores'])} PDFs no se pueden abrir")
+    return "\n".join(lineas)
+
+def planificar_renombrado(carpeta, patron=None):
+    """
+    Calcula en memoria, sin tocar ningún archivo, cómo renombrar cada PDF de la
+    carpeta (recursivamente) según el primer nombre de alumno extraído. Devuelve
+    una lista de (origen, destino, nombre) por carpeta y en orden alfabético;
+    origen y destino coinciden si el PDF ya se llama como su alumno, con o sin
+    _2, _3... (como los deja dividir_pdf_archivo).
+
+    Cada carpeta se lista una sola vez. Los nombres siguen la misma regla que al
+    dividir (ver _asignar_nombres): los destinos no coinciden entre sí ni con
+    los PDFs que se quedan como están (sin nombre o ya renombrados); si dos
+    alumnos dan el mismo nombre de archivo, el primero en orden alfabético del
+    origen se queda con él y los siguientes llevan _2, _3...
+    """
+    plan = []
+    for root_dir, subcarpetas, archivos in os.walk(carpeta):
+        subcarpetas.sort()
+        pdfs = sorted(archivo for archivo in archivos if archivo.lower().endswith('.pdf'))
+        nombres = {}
+        for archivo in pdfs:
+            encontrados = extraer_nombres_pdf(os.path.join(root_dir, archivo), patron, solo_primero=True)
+            if encontrados:
+                nombres[archivo] = encontrados[0]
+        renombrar = [archivo for archivo in pdfs if archivo in nombres and not _lleva_nombre(archivo, nombres[archivo])]
+        usados = _nombres_ocupados(set(pdfs).difference(renombrar))
+        destinos = dict(zip(renombrar, _asignar_nombres([nombres[archivo] for archivo in renombrar], usados)))
+        for archivo in pdfs:
+            if archivo in nombres:
+                plan.append((os.path.join(root_dir, archivo), os.path.join(root_dir, destinos.get(archivo, archivo)),
+                             nombres[archivo]))
+    return plan
+
+def guardar_plan_csv(plan, ruta):
+    """Guarda un plan de planificar_renombrado como CSV con las columnas origen, destino y nombre."""
+    import csv
+    carpeta = os.path.dirname(ruta)
+    if carpeta and not os.path.exists(carpeta):
+        os.makedirs(carpeta)
+    with open(ruta, "w", newline="", encoding="utf-8") as f:
+        escritor = csv.writer(f)
+        escritor.writerow(["origen", "destino", "nombre"])
+        escritor.writerows(plan)
+
+SUFIJO_RENOMBRANDO = ".renombrando"
+
+def aplicar_renombrado(plan, indice=None):
+    """
+    Aplica de una vez un plan de planificar_renombrado. Los PDFs cuyo nombre
+    actual es el destino de otro (p. ej. dos que intercambian nombres) se
+    apartan antes con SUFIJO_RENOMBRANDO, así que ningún archivo pisa a otro;
+    si un destino existe sin estar en el plan, ese PDF no se renombra. Con
+    `indice` cada PDF con nombre se registra en el índice de alumnos como
+    archivo entero (página 0). Devuelve la lista de errores.
+    """
+    errores = []
+
+    def fallo(origen, e):
+        errores.append(f"Error renombrando {origen}: {e}")
+        print(errores[-1])
+        informe.fallo(origen, f"Error renombrando: {e}")
+
+    destinos = {destino for origen, destino, _ in plan if origen != destino}
+    actuales = {}
+    for origen, destino, _ in plan:
+        actuales[origen] = origen
+        if origen != destino and origen in destinos:
+            try:
+                os.rename(origen, origen + SUFIJO_RENOMBRANDO)
+                actuales[origen] = origen + SUFIJO_RENOMBRANDO
+            except Exception as e:
+                fallo(origen, e)
+                actuales[origen] = None
+    for origen, destino, nombre in plan:
+        actual = actuales[origen]
+        if actual is None:
+            continue
+        if origen != destino:
+            try:
+                with informe.medir("renombrar", origen):
+                    if os.path.exists(destino) and not os.path.samefile(actual, destino):
+                        raise FileExistsError(f"{destino} ya existe")
+                    os.rename(actual, destino)
+            except Exception as e:
+                fallo(origen, e)
+                if actual != origen and not os.path.exists(origen):
+                    # Se devuelve a su nombre el PDF apartado que no se ha podido renombrar
+                    try:
+                        os.rename(actual, origen)
+                    except OSError:
+                        pass
+                continue
+        if indice is not None:
+            _indexar(indice, destino, [(0, nombre, destino)])
+    return errores
+
+def renombrar_pdfs(carpeta, patron=None, indice=None, plan_csv=None):
+    """
+    Renombra cada PDF de la carpeta (recursivamente) según el primer nombre
+    extraído: primero calcula el plan completo con planificar_renombrado, lo
+    guarda en `plan_csv` si se indica y después lo aplica con aplicar_renombrado.
+    Devuelve (plan, errores).
+    """
+    plan = planificar_renombrado(carpeta, patron)
+    if plan_csv:
+        guardar_plan_csv(plan, plan_csv)
+    return plan, aplicar_renombrado(plan, indice)
+
+# --- Unión y conversión ---
+def expandir_entradas(rutas, extensiones=('.pdf',)):
+    """
+    Convierte una lista de archivos y carpetas en la lista de archivos a procesar:
+    cada carpeta se sustituye por sus archivos con esas extensiones, ordenados por nombre.
+    """
+    archivos = []
+    for ruta in rutas:
+        if os.path.isdir(ruta):
+            archivos.extend(os.path.join(ruta, archivo) for archivo in sorted(os.listdir(ruta))
+                            if archivo.lower().endswith(extensiones))
+        else:
+            archivos.append(ruta)
+    return archivos
+
+def unir_pdfs(archivos, destino, progreso=None, cancelar=None, optimizar=True):
+    """
+    Une las páginas de todos los PDFs de `archivos` (o de las carpetas indicadas),
+    en orden, en el PDF `destino`.
+
+    Se abre un único PDF de origen cada vez y sus páginas se escriben en el
+    destino a medida que se leen (ver escritor_pdf.py), de modo que la memoria
+    no crece con el número de archivos. Con optimizar=True los objetos idénticos
+    de distintos orígenes (logotipos, fuentes) se escriben una sola vez y los
+    flujos se comprimen. Devuelve el número de páginas unidas.
+    """
+    from escritor_pdf import EscritorPDF
+    archivos = expandir_entradas(archivos)
+    total_paginas = sum(contar_paginas(archivo) for archivo in archivos) if progreso is not None else 0
+    hechas = 0
+    # Se escribe aparte y se mueve al final: si se cancela o falla no queda un PDF a medias
+    temporal = destino + SUFIJO_PARCIAL
+    try:
+        with EscritorPDF(temporal, optimizar=optimizar) as escritor:
+            for archivo in archivos:
+                try:
+                    with informe.medir("abrir", archivo):
+                        reader = abrir_pdf(archivo)
+                        escritor.empezar_origen(reader)
+                except Exception as e:
+                    raise RuntimeError(f"Error al procesar {archivo}: {e}")
+                for pagina in reader.pages:
+                    comprobar_cancelacion(cancelar)
+                    with informe.medir("escribir", archivo):
+                        escritor.anadir_pagina(pagina)
+                    informe.contar(archivo, paginas=1)
+                    hechas += 1
+                    if progreso is not None:
+                        progreso(hechas, total_paginas)
+                escritor.terminar_origen()
+                cerrar_pdf(reader)
+                del reader
+        os.replace(temporal, destino)
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+    if informe.activo():
+        informe.contar(destino, bytes_escritos=os.path.getsize(destino))
+    return hechas
+
+# --- Agrupación por alumno ---
+# Orígenes abiertos a la vez al escribir: los alumnos de un mismo grupo comparten
+# los mismos PDFs, así que con unos pocos no hace falta releer ninguno
+LECTORES_ABIERTOS = 8
+
+def _nombres_origen(archivo, patron, aviso=None, cancelar=None):
+    """
+    Devuelve (nombres, error): el nombre de alumno de cada página de `archivo`
+    (None en las que no tienen) o el error si no se puede abrir.
+    """
+    nombres = []
+    reader = None
+    try:
+        with informe.medir("abrir", archivo):
+            reader = abrir_pdf(archivo)
+            paginas = reader.pages
+        for pagina in paginas:
+            comprobar_cancelacion(cancelar)
+            with informe.medir("extraer", archivo):
+                nombres.append(extraer_nombre_pagina(pagina, patron))
+            if aviso is not None:
+                aviso(1)
+    except OperacionCancelada:
+        raise
+    except Exception as e:
+        informe.fallo(archivo, f"Error al abrir: {e}")
+        return [], f"Error al abrir {archivo}: {e}"
+    finally:
+        if reader is not None:
+            cerrar_pdf(reader)
+    return nombres, None
+
+def _nombres_origen_en_proceso(archivo, patron, cola=None, evento=None):
+    """Tarea de un proceso trabajador para agrupar_por_alumno."""
+    return _nombres_origen(archivo, patron, _avisador(cola), evento)
+
+def agrupar_por_alumno(archivos, carpeta_salida, patron=None, procesos=1, progreso=None, cancelar=None,
+                       indice=None, agrupar_paginas=False):
+    """
+    Reúne en un PDF por alumno todas sus páginas de los PDFs de `archivos` (o de
+    las carpetas indicadas), p. ej. los de cada grupo en cada evaluación. Las
+    páginas de cada alumno quedan en el orden de los orígenes y, dentro de cada
+    uno, en su orden original.
+
+    Una primera pasada extrae el nombre de cada página (en paralelo por origen
+    con procesos > 1) y construye en memoria el índice alumno → [(origen,
+    página)]; los nombres se comparan sin distinguir mayúsculas, acentos ni
+    espacios. Después cada alumno se escribe de una vez copiando sus páginas de
+    los orígenes, que se mantienen abiertos en una pequeña caché, sin dividir
+    primero ni volver a leer archivos generados. Las páginas sin nombre no se
+    copian y se devuelven en "sin_nombre"; con agrupar_paginas=True las que
+    siguen a una página con nombre del mismo origen se consideran parte de ese
+    boletín y van con ese alumno.
+
+    progreso(hechas, total) cuenta cada página dos veces (al leerla y al
+    escribirla); con `indice` los nombres se registran en el índice de alumnos.
+    Devuelve un dict con los alumnos como (nombre, salida, páginas), las páginas
+    copiadas, las páginas sin nombre como (origen, número de página) y los errores.
+    """
+    from collections import OrderedDict
+    from escritor_pdf import EscritorPDF
+    from indice import normalizar
+    archivos = expandir_entradas(archivos)
+    if not os.path.exists(carpeta_salida):
+        os.makedirs(carpeta_salida)
+    resultado = {"alumnos": [], "paginas": 0, "sin_nombre": [], "errores": []}
+    aviso = None
+    if progreso is not None:
+        total_paginas = 2 * sum(contar_paginas(archivo) for archivo in archivos)
+        hechas = [0]
+        def aviso(paginas):
+            hechas[0] += paginas
+            progreso(hechas[0], total_paginas)
+
+    # Primera pasada: índice en memoria de las páginas de cada alumno
+    procesos = max(1, min(procesos, len(archivos)))
+    tareas = [(archivo, patron) for archivo in archivos]
+    if procesos == 1:
+        extraidos = [_nombres_origen(*tarea, aviso, cancelar) for tarea in tareas]
+    else:
+        extraidos = _ejecutar_en_procesos(_nombres_origen_en_proceso, tareas, procesos, aviso, cancelar)
+    alumnos = OrderedDict()
+    for archivo, (nombres, error) in zip(archivos, extraidos):
+        if error:
+            print(error)
+            resultado["errores"].append(error)
+        alumno = None
+        for i, nombre in enumerate(nombres):
+            if nombre:
+                alumno = alumnos.setdefault(normalizar(nombre), {"nombre": nombre, "paginas": []})
+                alumno["paginas"].append((archivo, i))
+            elif agrupar_paginas and alumno is not None:
+                alumno["paginas"].append((archivo, i))
+            else:
+                resultado["sin_nombre"].append((archivo, i + 1))
+    if aviso is not None and resultado["sin_nombre"]:
+        # Las páginas sin nombre no se escriben: se dan ya por hechas
+        aviso(len(resultado["sin_nombre"]))
+
+    # Segunda pasada: un PDF por alumno, en el orden en que aparecen
+    lectores = OrderedDict()
+    def lector(archivo):
+        if archivo in lectores:
+            lectores.move_to_end(archivo)
+        else:
+            with informe.medir("abrir", archivo):
+                lectores[archivo] = abrir_pdf(archivo)
+            if len(lectores) > LECTORES_ABIERTOS:
+                cerrar_pdf(lectores.popitem(last=False)[1])
+        return lectores[archivo]
+
+    def escribir_alumno(f, paginas):
+        with EscritorPDF(f) as escritor:
+            posicion = 0
+            while posicion < len(paginas):
+                # Las páginas seguidas del mismo origen se copian con la misma tabla de referencias
+                archivo = paginas[posicion][0]
+                fin = posicion
+                while fin < len(paginas) and paginas[fin][0] == archivo:
+                    fin += 1
+                reader = lector(archivo)
+                seleccion = [reader.pages[i] for _, i in paginas[posicion:fin]]
+                escritor.empezar_origen(reader, seleccion)
+                for pagina in seleccion:
+                    comprobar_cancelacion(cancelar)
+                    with informe.medir("escribir", archivo):
+                        escritor.anadir_pagina(pagina)
+                    informe.contar(archivo, paginas=1)
+                    if aviso is not None:
+                        aviso(1)
+                escritor.terminar_origen()
+                posicion = fin
+
+    usados = set()
+    entradas_indice = {}
+    try:
+        for alumno in alumnos.values():
+            ruta_salida = os.path.join(carpeta_salida, _nombre_libre(alumno["nombre"], usados))
+            try:
+                tamano = escribir_atomico(ruta_salida, lambda f: escribir_alumno(f, alumno["paginas"]))
+            except OperacionCancelada:
+                raise
+            except Exception as e:
+                resultado["errores"].append(f"Error al guardar {ruta_salida}: {e}")
+                print(resultado["errores"][-1])
+                informe.fallo(ruta_salida, resultado["errores"][-1])
+                continue
+            informe.contar(ruta_salida, bytes_escritos=tamano)
+            resultado["alumnos"].append((alumno["nombre"], ruta_salida, len(alumno["paginas"])))
+            resultado["paginas"] += len(alumno["paginas"])
+            for archivo, i in alumno["paginas"]:
+                entradas_indice.setdefault(archivo, []).append((i + 1, alumno["nombre"], ruta_salida))
+    finally:
+        for reader in lectores.values():
+            cerrar_pdf(reader)
+    if indice is not None:
+        for archivo, entradas in entradas_indice.items():
+            _indexar(indice, archivo, sorted(entradas))
+    return resultado
+
+# --- Conversión de PDF a JPG ---
+# Páginas que se rasterizan en cada llamada a pdftoppm: son las únicas imágenes en memoria a la vez
+PAGINAS_POR_LOTE_JPG = 4
+# Rasterizar es caro por página, así que compensa repartir fragmentos mucho más pequeños
+PAGINAS_MINIMAS_POR_FRAGMENTO_JPG = 8
+DPI_POR_DEFECTO = 200
+CALIDAD_POR_DEFECTO = 75
+
+def _rasterizar_paginas(archivo, carpeta_destino, inicio, fin, dpi, calidad, gris, aviso=None, cancelar=None,
+                        guardar=escribir_atomico):
+    """
+    Rasteriza las páginas [inicio, fin) (numeradas desde 0) por lotes de
+    PAGINAS_POR_LOTE_JPG y guarda cada JPG con guardar(ruta, escribir) en cuanto
+    se obtiene.
+    """
+    convert_from_path = _importar_opcional("pdf2image", "convert_from_path")
+    for primera in range(inicio, fin, PAGINAS_POR_LOTE_JPG):
+        comprobar_cancelacion(cancelar)
+        ultima = min(primera + PAGINAS_POR_LOTE_JPG, fin)
+        with informe.medir("rasterizar", archivo):
+            imagenes = convert_from_path(archivo, dpi=dpi, first_page=primera + 1, last_page=ultima, grayscale=gris)
+        for numero, imagen in enumerate(imagenes, primera + 1):
+            ruta_salida = os.path.join(carpeta_destino, f"pagina_{numero}.jpg")
+            with informe.medir("escribir", archivo):
+                tamano = guardar(ruta_salida, lambda f: imagen.save(f, "JPEG", quality=calidad))
+            imagen.close()
+            informe.contar(archivo, paginas=1, bytes_escritos=tamano)
+            if aviso is not None:
+                aviso(1)
+        del imagenes
+
+def _rasterizar_fragmento(archivo, carpeta_destino, inicio, fin, dpi, calidad, gris, recoger=False,
+                          cola=None, evento=None):
+    """
+    Tarea de un proceso trabajador: rasteriza un rango de páginas. Con
+    recoger=True devuelve los JPG como lista de (ruta, bytes) en lugar de
+    escribirlos en disco.
+    """
+    from archivador import EntradasEnMemoria
+    if not recoger:
+        _rasterizar_paginas(archivo, carpeta_destino, inicio, fin, dpi, calidad, gris, _avisador(cola), evento)
+        return None
+    entradas = EntradasEnMemoria()
+    _rasterizar_paginas(archivo, carpeta_destino, inicio, fin, dpi, calidad, gris, _avisador(cola), evento,
+                        entradas.guardar)
+    return entradas.entradas
+
+def pdf_a_jpg(archivo, carpeta_destino, progreso=None, cancelar=None, dpi=DPI_POR_DEFECTO,
+              calidad=CALIDAD_POR_DEFECTO, gris=False, primera=None, ultima=None, procesos=1, archivador=None):
+    """
+    Guarda cada página de `archivo` como pagina_N.jpg en carpeta_destino.
+
+    Las páginas se rasterizan por lotes pequeños y cada JPG se escribe en cuanto
+    se obtiene, de modo que la memoria depende del tamaño del lote y no del
+    número de páginas. Con procesos > 1 el rango se reparte en fragmentos
+    contiguos que rasterizan procesos distintos. primera y ultima (desde 1,
+    ambas incluidas) limitan el rango; gris genera las imágenes en escala de
+    grises. Si carpeta_destino es un .zip, .tar, .tar.gz o .tgz (o se pasa un
+    `archivador`) los JPG se guardan en ese archivo en lugar de sueltos; los
+    de cada fragmento se añaden en cuanto termina. Devuelve el número de
+    páginas convertidas.
+    """
+    from archivador import Archivador, es_archivo_comprimido
+    if archivador is None and es_archivo_comprimido(carpeta_destino):
+        with Archivador(carpeta_destino) as archivador:
+            return pdf_a_jpg(archivo, carpeta_destino, progreso, cancelar, dpi, calidad, gris, primera, ultima,
+                             procesos, archivador)
+    total_paginas = contar_paginas(archivo)
+    if total_paginas == 0:
+        raise RuntimeError(f"No se puede abrir {archivo} o no tiene páginas.")
+    inicio = max(1, primera or 1) - 1
+    fin = min(total_paginas, ultima or total_paginas)
+    if inicio >= fin:
+        raise ValueError(f"Rango de páginas vacío: el PDF tiene {total_paginas} páginas.")
+    if not 1 <= calidad <= 95:
+        raise ValueError("La calidad JPEG debe estar entre 1 y 95.")
+    if archivador is None and not os.path.exists(carpeta_destino):
+        os.makedirs(carpeta_destino)
+    paginas = fin - inicio
+    aviso = None
+    if progreso is not None:
+        hechas = [0]
+        def aviso(numero):
+            hechas[0] += numero
+            progreso(hechas[0], paginas)
+    fragmentos = calcular_fragmentos(paginas, procesos, PAGINAS_MINIMAS_POR_FRAGMENTO_JPG)
+    if len(fragmentos) <= 1:
+        _rasterizar_paginas(archivo, carpeta_destino, inicio, fin, dpi, calidad, gris, aviso, cancelar,
+                            escribir_atomico if archivador is None else archivador.guardar)
+    else:
+        recoger = archivador is not None
+        tareas = [(archivo, carpeta_destino, inicio + desde, inicio + hasta, dpi, calidad, gris, recoger)
+                  for desde, hasta in fragmentos]
+        _ejecutar_en_procesos(_rasterizar_fragmento, tareas, len(fragmentos), aviso, cancelar,
+                              _anadidor(archivador, lambda entradas: entradas) if recoger else None)
+    return paginas
+
+EXTENSIONES_JPG = ('.jpg', '.jpeg')
+
+def _jpeg_recodificado(archivo):
+    """Convierte con PIL una imagen que no se puede incrustar tal cual en un JPEG en memoria."""
+    Image = _importar_opcional("PIL", "Image")
+    import io
+    datos = io.BytesIO()
+    with Image.open(archivo) as imagen:
+        imagen.convert('RGB').save(datos, "JPEG", quality=95)
+    datos.seek(0)
+    return datos
+
+def unir_jpgs(archivos, destino, progreso=None, cancelar=None):
+    """
+    Une las imágenes de `archivos` (o de las carpetas indicadas), en orden, en el
+    PDF `destino`, una página por imagen.
+
+    Los JPEG se incrustan sin recodificar: se copian sus bytes tal cual como
+    imágenes DCTDecode leyendo solo las cabeceras (ver escritor_pdf.py), una
+    imagen cada vez, así que no se pierde calidad y la memoria no crece con el
+    número de imágenes. Las que no se pueden incrustar así (otros formatos, JPEG
+    de 12 bits...) se convierten con PIL. Devuelve el número de imágenes unidas.
+    """
+    from escritor_pdf import EscritorPDF
+    archivos = expandir_entradas(archivos, EXTENSIONES_JPG)
+    if not archivos:
+        return 0
+    temporal = destino + SUFIJO_PARCIAL
+    try:
+        with EscritorPDF(temporal) as escritor:
+            for i, archivo in enumerate(archivos):
+                comprobar_cancelacion(cancelar)
+                try:
+                    with informe.medir("escribir", archivo):
+                        if not escritor.anadir_jpeg(archivo):
+                            escritor.anadir_jpeg(_jpeg_recodificado(archivo))
+                except OSError as e:
+                    raise RuntimeError(f"Error al procesar {archivo}: {e}")
+                informe.contar(archivo, paginas=1)
+                if progreso is not None:
+                    progreso(i + 1, len(archivos))
+        os.replace(temporal, destino)
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+    if informe.activo():
+        informe.contar(destino, bytes_escritos=os.path.getsize(destino))
+    return len(archivos)
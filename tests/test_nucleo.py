@@ -0,0 +1,62 @@
+"""Pruebas de la división de PDFs con nombres de alumno repetidos."""
+import os
+import sys
+import random
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import nucleo
+import benchmark
+
+
+class DividirConNombresRepetidos(unittest.TestCase):
+
+    def setUp(self):
+        self.carpeta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.carpeta, ignore_errors=True)
+        # Cada alumno aparece dos veces: los mismos boletines unidos dos veces
+        boletines = os.path.join(self.carpeta, "boletines.pdf")
+        self.nombres = benchmark.generar_boletines(boletines, 30, random.Random(0))
+        os.makedirs(os.path.join(self.carpeta, "origen"))
+        self.origen = os.path.join(self.carpeta, "origen", "grupo.pdf")
+        nucleo.unir_pdfs([boletines, boletines], self.origen)
+
+    def dividir(self, destino, procesos=1):
+        return nucleo.dividir_pdf_archivo(self.origen, destino, nombrar_por_alumno=True, procesos=procesos)
+
+    def test_ninguna_salida_pisa_a_otra(self):
+        destino = os.path.join(self.carpeta, "dividido")
+        resultado = self.dividir(destino)
+        self.assertEqual(len(os.listdir(destino)), 60)
+        self.assertEqual(len(set(resultado["salidas"])), 60)
+        self.assertIn(nucleo.sanitizar_nombre(self.nombres[0]) + "_2.pdf", os.listdir(destino))
+
+    def test_repetir_la_division_no_duplica_salidas(self):
+        destino = os.path.join(self.carpeta, "dividido")
+        primera = self.dividir(destino)
+        segunda = self.dividir(destino)
+        self.assertEqual(len(os.listdir(destino)), 60)
+        self.assertEqual(primera["salidas"], segunda["salidas"])
+
+    def test_repetir_la_division_de_carpeta_no_duplica_salidas(self):
+        destino = os.path.join(self.carpeta, "carpeta")
+        for _ in range(2):
+            nucleo.dividir_pdfs_carpeta(os.path.dirname(self.origen), destino, procesos=1)
+            self.assertEqual(len(os.listdir(os.path.join(destino, "grupo"))), 60)
+
+    def test_mismos_nombres_en_paralelo(self):
+        # Con 120 páginas hay dos fragmentos de al menos PAGINAS_MINIMAS_POR_FRAGMENTO
+        nucleo.unir_pdfs([self.origen, self.origen], self.origen + ".doble")
+        os.replace(self.origen + ".doble", self.origen)
+        secuencial = self.dividir(os.path.join(self.carpeta, "secuencial"))
+        paralelo = self.dividir(os.path.join(self.carpeta, "paralelo"), procesos=2)
+        self.assertEqual([os.path.basename(ruta) for ruta in secuencial["salidas"]],
+                         [os.path.basename(ruta) for ruta in paralelo["salidas"]])
+        self.assertEqual(len(set(paralelo["salidas"])), 120)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+"""
+Vigilancia de la carpeta de origen: divide los PDFs nuevos en cuanto terminan de copiarse.
+
+El programa de gestión del centro exporta los boletines en la carpeta de
+origen. vigilar_carpeta la recorre cada `intervalo` segundos con os.scandir
+(sin servicios externos ni inotify, así que funciona igual en carpetas de red)
+y da por terminado un PDF cuando su tamaño y su fecha no cambian entre dos
+recorridos, hace al menos `espera` segundos que no se modifica y acaba en
+%%EOF. Entonces se divide y se nombra por alumno con dividir_pdfs_carpeta en
+modo incremental: el manifiesto de la carpeta de destino recuerda los ya
+procesados, así que al reiniciar la vigilancia solo se procesan las novedades,
+y el diario permite continuar un PDF que se quedó a medias.
+"""
+import os
+import time
+import threading
+
+import nucleo
+import cache_texto
+
+INTERVALO_POR_DEFECTO = 5
+ESPERA_POR_DEFECTO = 10
+
+def _estado_pdfs(carpeta):
+    """Tamaño y fecha de modificación de cada PDF de la carpeta, por nombre."""
+    estado = {}
+    with os.scandir(carpeta) as entradas:
+        for entrada in entradas:
+            if entrada.name.lower().endswith(".pdf") and entrada.is_file():
+                try:
+                    datos = entrada.stat()
+                except OSError:
+                    # Se ha borrado o movido mientras se recorría la carpeta
+                    continue
+                estado[entrada.name] = (datos.st_size, datos.st_mtime)
+    return estado
+
+def _termina_en_eof(ruta):
+    """Indica si el PDF acaba con la marca %%EOF (un PDF a medio copiar no la tiene)."""
+    try:
+        with open(ruta, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - 1024))
+            return b"%%EOF" in f.read()
+    except OSError:
+        return False
+
+def vigilar_carpeta(carpeta_origen, carpeta_destino, intervalo=INTERVALO_POR_DEFECTO, espera=ESPERA_POR_DEFECTO,
+                    procesos=None, patron=None, indice=None, agrupar_paginas=False, progreso=None, cancelar=None,
+                    al_procesar=None):
+    """
+    Vigila carpeta_origen hasta que se active `cancelar` (un Event) y divide en
+    carpeta_destino cada PDF nuevo o modificado en cuanto está completo.
+
+    Los PDFs listos en un mismo recorrido se procesan juntos, repartidos entre
+    como mucho `procesos` procesos; progreso, patron, indice y agrupar_paginas
+    funcionan como en dividir_pdfs_carpeta. al_procesar(resultados), si se
+    indica, recibe los resultados de cada tanda. Un PDF que falla no se vuelve a
+    intentar hasta que cambia. Cualquier otro error de un recorrido (p. ej. la
+    carpeta de origen deja de estar accesible) se muestra y se reintenta en el
+    siguiente; solo la cancelación termina la vigilancia. Devuelve el número de
+    PDFs divididos.
+    """
+    if cancelar is None:
+        cancelar = threading.Event()
+    if not os.path.exists(carpeta_destino):
+        os.makedirs(carpeta_destino)
+    anterior = {}
+    procesados = {}
+    total = 0
+    while not cancelar.is_set():
+        try:
+            estado = _estado_pdfs(carpeta_origen)
+            ahora = time.time()
+            listos = [nombre for nombre, firma in sorted(estado.items())
+                      if anterior.get(nombre) == firma and procesados.get(nombre) != firma
+                      and ahora - firma[1] >= espera and _termina_en_eof(os.path.join(carpeta_origen, nombre))]
+            anterior = estado
+            if listos:
+                resultados = nucleo.dividir_pdfs_carpeta(carpeta_origen, carpeta_destino, procesos=procesos,
+                                                         progreso=progreso, cancelar=cancelar, incremental=True,
+                                                         patron=patron, indice=indice, agrupar_paginas=agrupar_paginas,
+                                                         archivos=listos)
+                # La vigilancia puede durar días: la caché de nombres se guarda tras cada tanda
+                cache_texto.volcar()
+                for nombre in listos:
+                    procesados[nombre] = estado[nombre]
+                nuevos = [resultado for resultado in resultados if not resultado.get("omitido")]
+                if nuevos:
+                    total += len(nuevos)
+                    print(f"{time.strftime('%H:%M:%S')} {len(nuevos)} PDFs divididos en {carpeta_destino}: "
+                          + ", ".join(resultado["archivo"] for resultado in nuevos))
+                if al_procesar is not None:
+                    al_procesar(resultados)
+        except nucleo.OperacionCancelada:
+            raise
+        except Exception as e:
+            # Una carpeta de red que desaparece un momento no debe parar la vigilancia
+            print(f"{time.strftime('%H:%M:%S')} Error al vigilar {carpeta_origen}, se reintenta en {intervalo} s: {e}")
+        cancelar.wait(intervalo)
+    return total